@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
 
+import csv
 import json
 import os
 import sys
 import argparse
+import asyncio
+import copy
+import itertools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-import pandas as pd
-from collections import OrderedDict
+import sqlalchemy as db
+from sqlalchemy.exc import OperationalError
 
 import globalbiodata as gbc
-from gbcutils.europepmc import epmc_search
+from gbcutils.cache import cache, default_cache_dir
+from gbcutils.europepmc import epmc_pubmed_metadata_batch_async, new_async_client
 
 
 def build_parser():
@@ -18,25 +26,23 @@ def build_parser():
     parser.add_argument('--version-file', type=str, default='version.json', help='JSON file describing version info')
     parser.add_argument('--resume-from', type=str, help='Short name of resource to resume processing from')
     parser.add_argument('--test', action='store_true', help='Use test database')
+    parser.add_argument('--reload-existing', action='store_true', help='Re-process records already loaded for this version')
+    parser.add_argument('--cache-dir', type=str, default=default_cache_dir, help='Directory for the EuropePMC/geolocation lookup cache')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the lookup cache')
+    parser.add_argument('--concurrency', type=int, default=50, help='Maximum number of concurrent EuropePMC search requests')
+    parser.add_argument('--workers', type=int, default=32, help='Number of threads for affiliation/country lookups')
+    parser.add_argument('--write-batch-size', type=int, default=2000, help='Number of resources to write per database transaction')
     return parser
 
 
-def uniq_with_order(s, to_remove=[]):
-    spl = [x.strip() for x in str(s).split(',')]
-    sl = list(OrderedDict.fromkeys(spl))
-    for r in to_remove:
-        if r in sl:
-            sl.remove(r)
-    return '; '.join(sl)
+def uniq_with_order(s, to_remove=()):
+    to_remove = set(to_remove)
+    return '; '.join(dict.fromkeys(x for x in (p.strip() for p in str(s).split(',')) if x not in to_remove))
 
 def explode_record(record):
     ids = [x.strip() for x in record['pubmed_id'].split(',')]
-    exploded_records = []
-    for i in ids:
-        new_record = record.copy()
-        new_record['pubmed_id'] = i
-        exploded_records.append(new_record)
-    return exploded_records
+    # one shallow dict per ID - each is mutated independently by split_record_data
+    return [{**record, 'pubmed_id': i} for i in ids]
 
 
 def split_record_data(record):
@@ -68,12 +74,115 @@ column_rename = {
     'extracted_url_coordinates':'url_coordinates'
 }
 
+def iter_records(path, extra_cols={}):
+    # stream the inventory CSV, renaming columns and mapping empty cells to None
+    with open(path, newline='') as fh:
+        for row in csv.DictReader(fh):
+            record = {column_rename.get(k, k): (v if v != '' else None) for k, v in row.items()}
+            record.update(extra_cols)
+            yield record
+
+def fetch_loaded_records(conn, version_name):
+    # (short_name, pubmed_id) pairs already written for this version, so reruns can skip them
+    result = conn.execute(db.text(
+        "SELECT r.short_name, p.pubmed_id FROM resource r "
+        "JOIN version v ON v.id = r.version_id "
+        "JOIN resource_publication rp ON rp.resource_id = r.id "
+        "JOIN publication p ON p.id = rp.publication_id "
+        "WHERE v.name = :version_name"
+    ), {'version_name': version_name})
+    return {(short_name, str(pubmed_id)) for short_name, pubmed_id in result}
+
+def build_resource(split_record, epmc_metadata, gmaps_api_key=None):
+    if epmc_metadata is None:
+        sys.stderr.write(f"[WARN] No EuropePMC record found for PubMedID {split_record['pubmed_id']} : skipping {split_record['short_name']}\n")
+        return None
+
+    print(f"Processing record {split_record['short_name']} (PubMedID {split_record['pubmed_id']})")
+    resource_publication = gbc.new_publication_from_EuropePMC_result(epmc_metadata, google_maps_api_key=gmaps_api_key)
+    resource = gbc.Resource(split_record)
+    resource.publications = [resource_publication]
+    return resource
+
+def _lock_error_code(e):
+    # MySQL deadlock (1213) / lock wait timeout (1205) code of an OperationalError, else None
+    code = getattr(e.orig, 'args', (None,))[0] if e.orig is not None else None
+    return code if code in (1213, 1205) else None
+
+def write_resources(resources, engine, max_retries=3, base_delay=0.5):
+    # a single transaction per batch, rather than a commit per resource and linked object.
+    # on deadlock the whole batch is retried; write() assigns ids as it goes, so each
+    # attempt works on a fresh copy rather than on ids from a rolled back transaction
+    for attempt in range(1, max_retries + 1):
+        try:
+            with engine.begin() as conn:
+                for resource in copy.deepcopy(resources):
+                    resource.write(conn=conn, engine=engine, debug=True)
+            return
+        except OperationalError as e:
+            code = _lock_error_code(e)
+            if code is None:
+                raise
+            delay = base_delay * (2 ** (attempt - 1)) * (1 + 0.25 * random.random())
+            sys.stderr.write(f"[retry] batch of {len(resources)}: OperationalError {code}; attempt {attempt}/{max_retries}; sleeping {delay:.2f}s\n")
+            time.sleep(delay)
+
+    # still contended : write one record at a time, each row upsert retrying on its own
+    sys.stderr.write(f"[retry] batch of {len(resources)} still deadlocking : writing records individually\n")
+    for resource in resources:
+        resource.write(engine=engine, debug=True)
+
+def iter_pending_records(records, loaded, resume_from=None):
+    # explode and split the inventory records still to load, skipping up to `resume_from`
+    # and any (short_name, pubmed_id) already in `loaded`
+    record_count, skipped_count = 0, 0
+    for r1 in records:
+        record_count += 1
+        if resume_from:
+            if r1['short_name'] == resume_from:
+                print(f"Skipped {record_count} records. Resuming from {resume_from}")
+                resume_from = None
+            else:
+                continue
+
+        print(f"Queueing record {r1['short_name']} (record {record_count})")
+        for r2 in explode_record(r1):
+            if (r2['short_name'], r2['pubmed_id']) in loaded:
+                skipped_count += 1
+                continue
+            yield split_record_data(r2)
+
+    if skipped_count:
+        print(f"Skipped {skipped_count} subrecords already loaded")
+
+async def load_records(records, engine, gmaps_api_key=None, concurrency=50, workers=32, write_batch_size=2000):
+    # per block : batched EuropePMC lookups, geolocation on the thread pool, then one write transaction.
+    # `records` may be a generator : only one block is read into memory at a time
+    loop = asyncio.get_running_loop()
+    records = iter(records)
+    prepared = 0
+    async with new_async_client() as client:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                block = list(itertools.islice(records, write_batch_size))
+                if not block:
+                    break
+                block_metadata = await epmc_pubmed_metadata_batch_async([r['pubmed_id'] for r in block], concurrency=concurrency, client=client)
+
+                # locationtagger/Google Maps lookups block, so run them on the thread pool
+                resources = await asyncio.gather(*(
+                    loop.run_in_executor(executor, build_resource, r, block_metadata.get(str(r['pubmed_id'])), gmaps_api_key)
+                    for r in block
+                ))
+                prepared += len(block)
+                print(f"Prepared {prepared} records")
+                write_resources([r for r in resources if r is not None], engine)
+                await loop.run_in_executor(executor, cache.flush) # commit this block's cache writes off the event loop
+
 def main(argv=None):
     parser = build_parser()
     args = parser.parse_args(argv)
 
-    resume_from = args.resume_from
-
     from gbcutils.db import get_gbc_connection # moved import to avoid SQL dependencies in testing
     gcp_connector, cloud_engine, cloud_conn = get_gbc_connection(
         test=args.test, readonly=False,
@@ -81,54 +190,27 @@ def main(argv=None):
         sqlpass=os.environ.get('GBC_SQL_PASS')
     )
 
+    if not args.no_cache:
+        cache.open(args.cache_dir)
+
     gmaps_api_key = os.environ.get('GOOGLE_MAPS_API_KEY')
     if not gmaps_api_key:
         sys.stderr.write("[WARN] Google Maps API key not found in environment variable GOOGLE_MAPS_API_KEY : using basic location detection only\n")
 
 
-    # read input CSV file
-    df = pd.read_csv(args.csv, dtype='str').rename(columns=column_rename).replace({float('nan'): None})
-
     # set version info from JSON file
     version_info = json.load(open(args.version_file, 'r'))
-    df['version_name'] = version_info['name']
-    df['version_date'] = version_info['date']
-    df['version_user'] = version_info['user']
-    df['version_data'] = version_info['data']
-    df['connection_date'] = version_info['connection_date'] or version_info['date']
-    df['is_latest'] = version_info['is_latest'] or 1
-
-    # process each record & generate GBC Resource objects
-    record_total = df.shape[0]
-    record_count = 0
-    for r1 in df.to_dict('records'):
-        record_count += 1
-        if resume_from:
-            if r1['short_name'] == resume_from:
-                print(f"Skipped {record_count} records. Resuming from {resume_from}")
-                resume_from = None
-            else:
-                continue
-
-        print(f"Processing record {r1['short_name']} ({record_count} of {record_total} records)")
-        exploded_records = explode_record(r1)
-        subrecord_total = len(exploded_records)
-        subrecord_count = 1
-        for r2 in exploded_records:
-            if subrecord_total > 1:
-                print(f"\tprocessing subrecord PubMedID {r2['pubmed_id']} ({subrecord_count} of {subrecord_total} subrecords)")
-            # orig_r = r2.copy()
-
-            split_record = split_record_data(r2)
-
-            # add publication info
-            epmc_metadata = epmc_search(f"EXT_ID:{split_record['pubmed_id']}")[0]
-            resource_publication = gbc.new_publication_from_EuropePMC_result(epmc_metadata, google_maps_api_key=gmaps_api_key)
-            resource = gbc.Resource(split_record)
-            resource.publications = [resource_publication]
-            resource.write(engine=cloud_engine, debug=True)
-
-            subrecord_count += 1
+    version_cols = {
+        'version_name': version_info['name'], 'version_date': version_info['date'],
+        'version_user': version_info['user'], 'version_data': version_info['data'],
+        'connection_date': version_info['connection_date'] or version_info['date'],
+        'is_latest': version_info['is_latest'] or 1
+    }
+
+    # process each record & generate GBC Resource objects, streaming the CSV one write batch at a time
+    loaded = set() if args.reload_existing else fetch_loaded_records(cloud_conn, version_cols['version_name'])
+    pending = iter_pending_records(iter_records(args.csv, version_cols), loaded, resume_from=args.resume_from)
+    asyncio.run(load_records(pending, cloud_engine, gmaps_api_key=gmaps_api_key, concurrency=args.concurrency, workers=args.workers, write_batch_size=args.write_batch_size))
 
     return 0
 
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import atexit
+import pickle
+import sqlite3
+import threading
+import functools
+
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+default_cache_dir = '.gbc_cache'
+default_expiry = 86400 * 30 # 30 days
+default_memory_size = 4096 # values mirrored in memory, least recently used dropped first
+default_commit_every = 100 # writes per sqlite commit
+
+_missing = object()
+
+class DiskCache:
+    """Persistent key/value store for deterministic external lookups (EuropePMC, Google Maps), backed by SQLite.
+
+    The cache is disabled until `open()` is called, so library code can memoize unconditionally
+    and only scripts that opt in (e.g. `bin/load_inventory.py`) touch the disk. The most recently
+    used values are also held in memory, and writes are committed in batches (see `flush()`).
+
+    Attributes:
+        path (Optional[str]): Path to the SQLite file backing the cache, or `None` when disabled.
+        expire (int): Default time-to-live for new entries, in seconds.
+        memory_size (int): Maximum number of values mirrored in memory.
+        commit_every (int): Number of writes between commits to the backing database.
+    """
+    def __init__(self, path: Optional[str] = None, expire: int = default_expiry,
+                 memory_size: int = default_memory_size, commit_every: int = default_commit_every):
+        self.path = None
+        self.expire = expire
+        self.memory_size = memory_size
+        self.commit_every = commit_every
+        self._db = None
+        self._memory = OrderedDict()
+        self._uncommitted = 0
+        self._lock = threading.Lock() # the sqlite connection is shared by lookup threads
+        atexit.register(self.close) # commit any pending writes
+        if path:
+            self.open(path)
+
+    def open(self, cache_dir: str = default_cache_dir) -> 'DiskCache':
+        """Enable the cache, storing entries under `cache_dir`.
+
+        Args:
+            cache_dir (str): Directory to hold the cache database (created if missing).
+
+        Returns:
+            The cache itself.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.close()
+        self.path = os.path.join(cache_dir, 'cache.sqlite')
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)")
+        self._db.commit()
+        return self
+
+    def close(self):
+        """Commit pending writes, close the backing database and disable the cache."""
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+        self._db, self.path = None, None
+        self._memory = OrderedDict()
+
+    def flush(self):
+        """Commit any writes not yet committed to the backing database."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._uncommitted:
+                self._db.commit()
+                self._uncommitted = 0
+
+    def _remember(self, skey, value):
+        # mirror `value` in the in-memory LRU (called with the lock held)
+        self._memory[skey] = value
+        self._memory.move_to_end(skey)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def get(self, key: tuple, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if missing, expired or the cache is disabled."""
+        if not self.enabled:
+            return default
+        skey = repr(key)
+        with self._lock:
+            if skey in self._memory:
+                self._memory.move_to_end(skey)
+                return self._memory[skey]
+            row = self._db.execute("SELECT value, expires FROM cache WHERE key = ?", (skey,)).fetchone()
+            if row is None or (row[1] is not None and row[1] < time.time()):
+                return default
+            value = pickle.loads(row[0])
+            self._remember(skey, value)
+        return value
+
+    def set(self, key: tuple, value: Any, expire: Optional[int] = None):
+        """Store `value` under `key` (no-op when the cache is disabled), committing every `commit_every` writes."""
+        if not self.enabled:
+            return
+        skey = repr(key)
+        expires = time.time() + (expire or self.expire)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (skey, pickle.dumps(value), expires)
+            )
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self._db.commit()
+                self._uncommitted = 0
+            self._remember(skey, value)
+
+    def memoize(self, key: Callable[..., tuple], expire: Optional[int] = None) -> Callable:
+        """Decorator caching a function's return value under `key(*args, **kwargs)`.
+
+        Keys should carry a version after the name, e.g. `('find_country', 2, s)`, bumped
+        whenever the function's output changes so entries from older code are not reused.
+
+        Args:
+            key (Callable): Builds the cache key from the decorated function's arguments.
+            expire (Optional[int]): Time-to-live in seconds (defaults to the cache's `expire`).
+
+        Returns:
+            The decorator.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                k = key(*args, **kwargs)
+                value = self.get(k, _missing)
+                if value is _missing:
+                    value = func(*args, **kwargs)
+                    self.set(k, value, expire=expire)
+                return value
+            return wrapper
+        return decorator
+
+
+# shared cache for all gbcutils/globalbiodata lookups - enable with `cache.open()`
+cache = DiskCache()
@@ -10,7 +10,10 @@ from sqlalchemy.engine import Connection, Engine
 if TYPE_CHECKING:
     from google.cloud.sql.connector import Connector
 
-def get_gbc_connection(test: bool = False, readonly: bool = True, sqluser: str = "gbcreader", sqlpass: str = None) -> tuple[Connector, Engine, Connection]:
+def get_gbc_connection(
+    test: bool = False, readonly: bool = True, sqluser: str = "gbcreader", sqlpass: str = None,
+    pool_size: int = 20, max_overflow: int = 40, warm_pool: int = 0, local_infile: bool = False
+) -> tuple[Connector, Engine, Connection]:
     """Get a connection to the GBC Google Cloud SQL instance.
 
     Args:
@@ -18,6 +21,12 @@ def get_gbc_connection(test: bool = False, readonly: bool = True, sqluser: str =
         readonly (bool): Whether to connect in read-only mode.
         sqluser (str): The SQL username to connect with.
         sqlpass (str): The SQL password to connect with. Required if readonly is False.
+        pool_size (int): Number of connections kept open in the engine's pool.
+        max_overflow (int): Number of extra connections allowed beyond `pool_size` under load.
+        warm_pool (int): Number of pooled connections to open up front, so the Cloud SQL
+            Connector handshake happens at startup rather than on first use.
+        local_infile (bool): Whether to allow `LOAD DATA LOCAL INFILE` on the connections, as needed
+            by the `load_data=True` bulk inserts. Only allowed when readonly is False.
 
     Returns:
         A tuple containing the Google Cloud SQL Connector, SQLAlchemy Engine, and SQLAlchemy Connection objects.
@@ -26,6 +35,8 @@ def get_gbc_connection(test: bool = False, readonly: bool = True, sqluser: str =
 
     if not readonly and not sqlpass:
         raise ValueError("You must provide a SQL user credentials if not in readonly mode.")
+    if readonly and local_infile:
+        raise ValueError("local_infile is only available when not in readonly mode.")
 
     database = "gbc-publication-analysis:europe-west2:gbc-sql/gbc-publication-analysis"
     database += "-test" if test else ""
@@ -37,10 +48,20 @@ def get_gbc_connection(test: bool = False, readonly: bool = True, sqluser: str =
             instance, "pymysql",
             user=sqluser,
             password=sqlpass,
-            db=db_name
+            db=db_name,
+            local_infile=local_infile # for bulk LOAD DATA LOCAL INFILE ingest
         )
         return conn
 
-    cloud_engine = db.create_engine("mysql+pymysql://", creator=getcloudconn, pool_recycle=60 * 5, pool_pre_ping=True)
-    cloud_engine.execution_options(isolation_level="READ COMMITTED")
+    cloud_engine = db.create_engine(
+        "mysql+pymysql://", creator=getcloudconn,
+        pool_size=pool_size, max_overflow=max_overflow, pool_recycle=60 * 5, pool_pre_ping=True,
+        isolation_level="READ COMMITTED"
+    )
+
+    # check out and return connections to prime the pool
+    warm_conns = [cloud_engine.connect() for _ in range(min(warm_pool, pool_size))]
+    for c in warm_conns:
+        c.close()
+
     return (gcp_connector, cloud_engine, cloud_engine.connect())
\ No newline at end of file
@@ -3,22 +3,28 @@
 import sys
 import os
 import re
+import json
 import glob
 import gzip
 import shutil
 
 import random
+import asyncio
 from http.client import IncompleteRead
 from urllib3.exceptions import ProtocolError
 import time
+import atexit
 
 from typing import Optional
 
+import httpx
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 
+from gbcutils.cache import cache
+
 VERBOSE = False
 retry_strategy = Retry(
     total=5,                      # Try up to 5 times
@@ -31,11 +37,39 @@ retry_strategy = Retry(
     respect_retry_after_header=True,
 )
 
-adapter = HTTPAdapter(max_retries=retry_strategy)
+adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry_strategy)
 session = requests.Session()
 session.mount("https://", adapter)
 session.mount("http://", adapter)
 session.headers.update({"User-Agent": "gbc-mentions/1.0"})
+atexit.register(session.close)
+
+# faster JSON decoding for large 'core' responses when orjson is installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# async client for concurrent lookups - HTTP/2 only when the `h2` extra is installed
+try:
+    import h2  # noqa: F401
+    _http2_available = True
+except ImportError:
+    _http2_available = False
+
+def new_async_client() -> httpx.AsyncClient:
+    """Return a new async client for the `*_async` Europe PMC lookups.
+
+    A client is bound to the event loop it is first used on, so open one per loop, e.g.
+    `async with new_async_client() as client:` inside the coroutine passed to `asyncio.run`.
+    """
+    return httpx.AsyncClient(
+        http2=_http2_available,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=50),
+        headers={"User-Agent": "gbc-mentions/1.0"},
+        timeout=15,
+    )
 
 # query EuropePMC for publication metadata
 max_retries = 5
@@ -55,20 +89,140 @@ def query_europepmc(endpoint: str, request_params: Optional[dict] = None, no_exi
     if not endpoint.startswith("http"):
         endpoint = f"{epmc_base_url}/{endpoint}"
 
+    # retries (incl. backoff on 429/5xx) are handled by the session's adapter
+    try:
+        response = session.get(endpoint, params=request_params, timeout=(3.05, 30))
+    except requests.RequestException as e:
+        if no_exit:
+            return None
+        sys.exit(f"Error: request failed for {endpoint}: {e}")
+
+    if response.status_code == 200:
+        return _json_loads(response.content) if 'json' in response.headers.get('Content-Type', '') else response.text
+    elif no_exit:
+        return None
+    else:
+        sys.exit(f"Error: {response.status_code} for {endpoint}")
+
+async def query_europepmc_async(endpoint: str, request_params: Optional[dict] = None, no_exit: bool = False, client: Optional[httpx.AsyncClient] = None) -> Optional[dict]:
+    """Query Europe PMC REST API endpoint with retries, asynchronously.
+
+    Args:
+        endpoint (str): The Europe PMC API endpoint to query.
+        request_params (Optional[dict]): Dictionary of query parameters.
+        no_exit (bool): If `True`, do not exit on error, return `None` instead.
+        client (Optional[httpx.AsyncClient]): Client from `new_async_client` to reuse across calls
+            (a temporary one is opened for this request if not given).
+
+    Returns:
+        The JSON response from Europe PMC, or `None` on error if `no_exit` is `True`.
+    """
+    if client is None:
+        async with new_async_client() as client:
+            return await query_europepmc_async(endpoint, request_params, no_exit=no_exit, client=client)
+
+    if not endpoint.startswith("http"):
+        endpoint = f"{epmc_base_url}/{endpoint}"
+
     for attempt in range(max_retries):
         try:
-            response = session.get(endpoint, params=request_params, timeout=15)
+            response = await client.get(endpoint, params=request_params)
             if response.status_code == 200:
-                return response.json() if 'json' in response.headers.get('Content-Type', '') else response.text
+                return _json_loads(response.content) if 'json' in response.headers.get('Content-Type', '') else response.text
+            elif response.status_code in retry_strategy.status_forcelist:
+                print(f"⚠️ Got {response.status_code} for {endpoint}. Retrying ({attempt + 1}/{max_retries})...")
+            elif no_exit:
+                return None
             else:
-                if no_exit:
-                    return None
-                else:
-                    sys.exit(f"Error: {response.status_code} for {endpoint}")
-        except requests.RequestException as e:
+                sys.exit(f"Error: {response.status_code} for {endpoint}")
+        except (httpx.HTTPError, ValueError) as e:
             print(f"⚠️ Request failed: {e}. Retrying ({attempt + 1}/{max_retries})...")
+        await asyncio.sleep(retry_strategy.backoff_factor * (2 ** attempt))
+
+    if no_exit:
+        return None
     sys.exit("Max retries exceeded.")
 
+async def epmc_search_async(query: str, result_type: str = 'core', page_size: int = 1000, client: Optional[httpx.AsyncClient] = None) -> list:
+    """Search Europe PMC for a single page of results, asynchronously.
+
+    Intended for targeted lookups (e.g. `EXT_ID:<pmid>`) that are run concurrently - use
+    `epmc_search` for paginated queries.
+
+    Args:
+        query (str): The search query string.
+        result_type (str): The type of results to return ('core', 'lite', 'idlist').
+        page_size (int): Number of results per page (max 1000).
+        client (Optional[httpx.AsyncClient]): Client from `new_async_client` to reuse across calls.
+
+    Returns:
+        List of search results.
+    """
+    search_params = {
+        'query': query, 'resultType': result_type,
+        'format': 'json', 'pageSize': page_size
+    }
+    data = await query_europepmc_async(f"{epmc_base_url}/search", search_params, client=client)
+    return data['resultList']['result']
+
+# number of PubMed IDs OR-ed together in a single search request
+epmc_id_batch_size = 50
+
+async def epmc_pubmed_metadata_batch_async(pubmed_ids: list, concurrency: int = 20, client: Optional[httpx.AsyncClient] = None) -> dict:
+    """Return the Europe PMC 'core' records for many PubMed IDs, memoized in the shared disk cache.
+
+    IDs missing from the cache are looked up `epmc_id_batch_size` at a time with a single
+    `EXT_ID:a OR EXT_ID:b ...` search each, with up to `concurrency` searches in flight.
+
+    Args:
+        pubmed_ids (list): The PubMed IDs to look up.
+        concurrency (int): Maximum number of concurrent search requests.
+        client (Optional[httpx.AsyncClient]): Client from `new_async_client` to reuse across calls
+            (a temporary one is opened for the batch if not given).
+
+    Returns:
+        Dictionary of PubMed ID (as a string) to Europe PMC search result. IDs with no match are omitted.
+    """
+    found, missing = {}, []
+    for pmid in dict.fromkeys(str(i) for i in pubmed_ids):
+        metadata = cache.get(('epmc_pubmed', 1, pmid))
+        if metadata is None:
+            missing.append(pmid)
+        else:
+            found[pmid] = metadata
+
+    if missing and client is None:
+        async with new_async_client() as client:
+            return {**found, **await epmc_pubmed_metadata_batch_async(missing, concurrency=concurrency, client=client)}
+
+    semaphore = asyncio.Semaphore(concurrency)
+    async def _search_chunk(chunk):
+        query = f"({' OR '.join(f'EXT_ID:{pmid}' for pmid in chunk)}) AND SRC:MED"
+        async with semaphore:
+            return await epmc_search_async(query, client=client)
+
+    chunks = [missing[i:i + epmc_id_batch_size] for i in range(0, len(missing), epmc_id_batch_size)]
+    missing = set(missing)
+    for results in await asyncio.gather(*(_search_chunk(c) for c in chunks)):
+        for result in results:
+            pmid = result.get('pmid')
+            if pmid in missing and pmid not in found:
+                found[pmid] = result
+                cache.set(('epmc_pubmed', 1, pmid), result)
+    return found
+
+async def epmc_pubmed_metadata_async(pubmed_id: str, client: Optional[httpx.AsyncClient] = None) -> Optional[dict]:
+    """Return the Europe PMC 'core' record for a PubMed ID, memoized in the shared disk cache.
+
+    Args:
+        pubmed_id (str): The PubMed ID to look up.
+        client (Optional[httpx.AsyncClient]): Client from `new_async_client` to reuse across calls.
+
+    Returns:
+        The Europe PMC search result for the PubMed ID, or `None` if not found.
+    """
+    return (await epmc_pubmed_metadata_batch_async([pubmed_id], client=client)).get(str(pubmed_id))
+
 def epmc_search(query: str, result_type: str = 'core', limit: int = 0, cursor: Optional[str] = None, returncursor: bool = False, fields: list = [], page_size: int = 1000) -> Optional[list]:
     """Search Europe PMC with pagination support.
 
@@ -385,7 +539,7 @@ def get_fulltext_body(pmcid: str, path: Optional[str] = None, dest: str = '/tmp'
         # 1. Download the XML
         if VERBOSE: print(f"[api] Querying EuropePMC's API for full text XML for {pmcid}")
         url = f"{epmc_base_url}/{pmcid}/fullTextXML"
-        response = requests.get(url)
+        response = session.get(url, timeout=(3.05, 30))
         if response.status_code != 200:
             return (None, None)
         xml = response.text
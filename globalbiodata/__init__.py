@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+# utils_fetch must be imported before the model classes: it imports them itself once its fetchers are defined
+from .utils_db import insert_into_table, delete_from_table, select_from_table, insert_resource_mention_bulk, insert_link_rows, fetch_cache
+from .utils_fetch import fetch_accession, fetch_grant, fetch_grant_agency, fetch_publication, fetch_resource, fetch_resource_mention, fetch_url, fetch_connection_status, fetch_version
+from .utils_fetch import fetch_one_grant, fetch_one_grant_agency, fetch_one_publication, fetch_one_resource, fetch_one_url, fetch_one_version
+from .utils_fetch import fetch_all_resources, fetch_all_grant_agencies, fetch_all_grants, fetch_all_publications, fetch_all_urls, fetch_all_connection_statuses, fetch_all_versions, fetch_all_online_resources, iter_all_resources, iter_all_publications
+
 from .accession import Accession
 from .grant import Grant, GrantAgency
 from .publication import Publication
@@ -8,9 +14,6 @@ from .resource_mention import ResourceMention, MatchedAlias
 from .url import URL, ConnectionStatus
 from .version import Version
 
-from .utils_db import insert_into_table, delete_from_table, select_from_table
-from .utils_fetch import fetch_accession, fetch_grant, fetch_grant_agency, fetch_publication, fetch_resource, fetch_resource_mention, fetch_url, fetch_connection_status, fetch_version
-from .utils_fetch import fetch_all_resources, fetch_all_grant_agencies, fetch_all_grants, fetch_all_publications, fetch_all_urls, fetch_all_connection_statuses, fetch_all_versions, fetch_all_online_resources
 from .utils import extract_fields_by_type, new_publication_from_EuropePMC_result
 
 __all__ = [
@@ -30,6 +33,9 @@ __all__ = [
     'insert_into_table',
     'delete_from_table',
     'select_from_table',
+    'insert_resource_mention_bulk',
+    'insert_link_rows',
+    'fetch_cache',
 
     # fetch utils
     'fetch_accession',
@@ -41,6 +47,12 @@ __all__ = [
     'fetch_url',
     'fetch_connection_status',
     'fetch_version',
+    'fetch_one_grant',
+    'fetch_one_grant_agency',
+    'fetch_one_publication',
+    'fetch_one_resource',
+    'fetch_one_url',
+    'fetch_one_version',
     'fetch_all_resources',
     'fetch_all_grant_agencies',
     'fetch_all_grants',
@@ -49,6 +61,8 @@ __all__ = [
     'fetch_all_connection_statuses',
     'fetch_all_versions',
     'fetch_all_online_resources',
+    'iter_all_resources',
+    'iter_all_publications',
 
     # other utils
     'extract_fields_by_type',
@@ -6,7 +6,7 @@ from .version import Version
 from .publication import Publication
 
 from .utils import extract_fields_by_type
-from .utils_db import insert_into_table, delete_from_table
+from .utils_db import insert_into_table, insert_link_rows, delete_from_table
 from .utils_fetch import fetch_accession
 
 from typing import Optional
@@ -81,8 +81,8 @@ class Accession:
                     new_pub_id = p.write(conn=conn, engine=engine, debug=debug)
                     p.id = new_pub_id
 
-                # create links between resource and publication tables
-                insert_into_table('accession_publication', {'accession':self.accession, 'publication_id':p.id}, conn=conn, engine=engine, debug=debug)
+            # create links between accession and publication tables
+            insert_link_rows('accession_publication', [(self.accession, p.id) for p in self.publications], conn=conn, engine=engine, debug=debug)
 
     def delete(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> int:
         """Delete Accession from database along with associated links to publications.
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from .utils_db import insert_into_table, delete_from_table
-from .utils_fetch import fetch_grant, fetch_grant_agency
+from .utils_fetch import fetch_grant, fetch_one_grant, fetch_one_grant_agency
 
 from typing import Optional
 from sqlalchemy.engine import Connection, Engine
@@ -90,7 +90,7 @@ class Grant:
         Returns:
             The Grant object.
         """
-        return fetch_grant({'ext_grant_id': ext_id}, conn=conn, engine=engine, debug=debug)
+        return fetch_one_grant({'ext_grant_id': ext_id}, conn=conn, engine=engine, debug=debug)
 
     def fetch_by_grant_agency_id(grant_agency_id: int, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
         """Fetch Grant from database by GrantAgency ID.
@@ -191,6 +191,6 @@ class GrantAgency:
             debug (bool, optional): If `True`, print debug information.
 
         Returns:
-            The list of GrantAgency objects if more than one is found, else a single GrantAgency object, else `None`.
+            The GrantAgency object, or `None` if not found.
         """
-        return fetch_grant_agency({'name': name}, conn=conn, engine=engine, debug=debug)
+        return fetch_one_grant_agency({'name': name}, conn=conn, engine=engine, debug=debug)
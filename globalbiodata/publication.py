@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from .grant import Grant
+from .version import _parse_date
 
-from .utils_db import insert_into_table, delete_from_table
-from .utils_fetch import fetch_publication, fetch_accession, fetch_resource_mention
+from .utils_db import insert_into_table, insert_link_rows, delete_from_table
+from .utils_fetch import fetch_one_publication, fetch_grant, fetch_accession, fetch_resource_mention, _fetch_linked
 
 from typing import Optional, TYPE_CHECKING
-from datetime import datetime, date
+from datetime import date
 
 if TYPE_CHECKING: # only import on type checking to avoid circular imports
     from sqlalchemy.engine import Connection, Engine
@@ -52,7 +53,7 @@ class Publication:
         self.title = p.get('publication_title') or p.get('title')
         self.pubmed_id = None if p.get('pubmed_id', '') == '' else p.get('pubmed_id')
         self.pmc_id = None if p.get('pmc_id', '') == '' else p.get('pmc_id')
-        self.publication_date = datetime.strptime(p.get('publication_date'), "%Y-%m-%d").date() if p.get('publication_date') and type(p.get('publication_date')) is str else p.get('publication_date')
+        self.publication_date = _parse_date(p.get('publication_date'))
         self.authors = p.get('authors') if type(p.get('authors')) is not list else '; '.join(p.get('authors'))
         self.affiliation = p.get('affiliation') if type(p.get('affiliation')) is not list else '; '.join(p.get('affiliation'))
         self.affiliation_countries = p.get('affiliation_countries') if type(p.get('affiliation_countries')) is not list else '; '.join(p.get('affiliation_countries'))
@@ -79,6 +80,17 @@ class Publication:
         ])
         return f"Publication({pub_str})"
 
+    def __getattr__(self, name):
+        # grants of an unexpanded fetch are loaded from the database on first access
+        deferred = self.__dict__.get('__deferred__', ())
+        if name not in deferred:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        value = _fetch_linked('publication_grant', 'publication_id', 'grant_id', self.id, fetch_grant, conn=self.__conn__, engine=self.__engine__) or None
+        deferred.discard(name)
+        setattr(self, name, value)
+        return value
+
     def write(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False, force: bool = False) -> int:
         """Write Publication to database along with associated Grant data.
 
@@ -94,8 +106,8 @@ class Publication:
         conn = conn or self.__conn__
         engine = engine or self.__engine__
 
-        self_dict = self.__dict__.copy()
-        pub_grants = self_dict.pop('grants')
+        self_dict = {k: v for k, v in self.__dict__.items() if k not in ('__conn__', '__engine__', '__deferred__')}
+        pub_grants = self_dict.pop('grants', None) # grants never loaded from the database are not re-linked
 
         if not self.title or not self.authors or self.citation_count is None:
             raise ValueError("Publication must have a title, authors, and citation count to write to the database.")
@@ -110,8 +122,8 @@ class Publication:
                     new_grant_id = g.write(conn=conn, engine=engine, debug=debug)
                     g.id = new_grant_id
 
-                # create links between publication and grant tables
-                insert_into_table('publication_grant', {'publication_id':new_pub_id, 'grant_id':g.id}, conn=conn, engine=engine, debug=debug)
+            # create links between publication and grant tables
+            insert_link_rows('publication_grant', [(new_pub_id, g.id) for g in pub_grants], conn=conn, engine=engine, debug=debug)
 
         return self.id
 
@@ -150,7 +162,7 @@ class Publication:
         Returns:
             The Publication object.
         """
-        return fetch_publication({'id': id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
+        return fetch_one_publication({'id': id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
 
     def fetch_by_pubmed_id(pubmed_id: int, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Publication:
         """Fetch Publication from database by PubMed ID.
@@ -164,7 +176,7 @@ class Publication:
         Returns:
             The Publication object.
         """
-        return fetch_publication({'pubmed_id': pubmed_id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
+        return fetch_one_publication({'pubmed_id': pubmed_id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
 
     def fetch_by_pmc_id(pmc_id: str, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Publication:
         """Fetch Publication from database by PubMed Central ID.
@@ -178,36 +190,48 @@ class Publication:
         Returns:
             The Publication object.
         """
-        return fetch_publication({'pmc_id': pmc_id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
+        return fetch_one_publication({'pmc_id': pmc_id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
 
-    def accessions(self) -> list[Accession]:
+    def accessions(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None) -> list[Accession]:
         """Return list of Accession objects associated with this Publication.
 
+        Args:
+            conn (Optional[Connection], optional): SQLAlchemy Connection object (defaults to the one this Publication was fetched with; expanded fetches do not keep it, so pass one).
+            engine (Optional[Engine], optional): SQLAlchemy Engine object (defaults to the one this Publication was fetched with).
+
         Returns:
             List of Accession objects.
         """
-        return fetch_accession({'publication_id': self.id}, conn=self.__conn__, engine=self.__engine__, debug=False)
+        return fetch_accession({'publication_id': self.id}, conn=conn or self.__conn__, engine=engine or self.__engine__, debug=False)
 
-    def mentions(self) -> list[ResourceMention]:
+    def mentions(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None) -> list[ResourceMention]:
         """Return list of ResourceMention objects that mention this Publication.
 
+        Args:
+            conn (Optional[Connection], optional): SQLAlchemy Connection object (defaults to the one this Publication was fetched with; expanded fetches do not keep it, so pass one).
+            engine (Optional[Engine], optional): SQLAlchemy Engine object (defaults to the one this Publication was fetched with).
+
         Returns:
             List of ResourceMention objects.
         """
-        return fetch_resource_mention({'publication_id': self.id}, conn=self.__conn__, engine=self.__engine__, debug=False)
+        return fetch_resource_mention({'publication_id': self.id}, conn=conn or self.__conn__, engine=engine or self.__engine__, debug=False)
 
-    def references_resources(self) -> list[Resource]:
+    def references_resources(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None) -> list[Resource]:
         """Return list of Resource objects that are referenced by this Publication either via an Accession or a ResourceMention.
 
+        Args:
+            conn (Optional[Connection], optional): SQLAlchemy Connection object (defaults to the one this Publication was fetched with; expanded fetches do not keep it, so pass one).
+            engine (Optional[Engine], optional): SQLAlchemy Engine object (defaults to the one this Publication was fetched with).
+
         Returns:
             List of Resource objects.
         """
         resources = {}
-        accessions = self.accessions()
+        accessions = self.accessions(conn=conn, engine=engine)
         for acc in accessions:
             resources[acc.resource.id] = acc.resource
 
-        mentions = self.mentions()
+        mentions = self.mentions(conn=conn, engine=engine)
         for mention in mentions:
             resources[mention.resource.id] = mention.resource
 
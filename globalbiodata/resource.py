@@ -6,11 +6,10 @@ from .version import Version
 from .publication import Publication
 from .grant import Grant
 
-from .utils_db import insert_into_table, delete_from_table
-from .utils_fetch import fetch_resource, fetch_accession, fetch_resource_mention
+from .utils_db import insert_into_table, insert_link_rows, delete_from_table, clear_latest
+from .utils_fetch import fetch_resource, fetch_one_resource, fetch_publication, fetch_grant, fetch_accession, fetch_resource_mention, _fetch_linked
 
 from typing import Optional, TYPE_CHECKING
-import sqlalchemy as db
 
 if TYPE_CHECKING: # only import on type checking to avoid circular imports
     from sqlalchemy.engine import Connection, Engine
@@ -87,6 +86,20 @@ class Resource:
         ])
         return f"Resource({resource_str})"
 
+    def __getattr__(self, name):
+        # publications and grants of an unexpanded fetch are loaded from the database on first access
+        deferred = self.__dict__.get('__deferred__', ())
+        if name not in deferred:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        if name == 'publications':
+            value = _fetch_linked('resource_publication', 'resource_id', 'publication_id', self.id, fetch_publication, conn=self.__conn__, engine=self.__engine__)
+        else:
+            value = _fetch_linked('resource_grant', 'resource_id', 'grant_id', self.id, fetch_grant, conn=self.__conn__, engine=self.__engine__)
+        deferred.discard(name)
+        setattr(self, name, value)
+        return value
+
     def write(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False, force: bool = False) -> int:
         """Write Resource to database along with associated URL, Version, Publication, and Grant data.
 
@@ -112,9 +125,7 @@ class Resource:
 
         # set is_latest to 0 for other versions of this resource
         if self.is_latest:
-            lconn = engine.connect()
-            lconn.execute(db.text(f"UPDATE resource SET is_latest = 0 WHERE short_name = '{self.short_name}'"))
-            lconn.commit()
+            clear_latest('resource', {'short_name':self.short_name}, conn=conn, engine=engine, debug=debug)
 
         resource_cols = {
             'id':self.id, 'short_name':self.short_name, 'common_name':self.common_name, 'full_name':self.full_name,
@@ -124,23 +135,25 @@ class Resource:
         new_resource_id = insert_into_table('resource', resource_cols, conn=conn, engine=engine, debug=debug)
         self.id = new_resource_id
 
-        if self.publications:
+        # links that were never loaded from the database are left as they are
+        deferred = self.__dict__.get('__deferred__', ())
+        if 'publications' not in deferred and self.publications:
             # delete_from_table('resource_publication', {'resource_id':new_resource_id}, conn=conn, engine=engine, debug=debug) # delete existing links
             for p in self.publications:
                 if not p.id or force:
                     new_pub_id = p.write(conn=conn, engine=engine, debug=debug)
                     p.id = new_pub_id
-                # create links between resource and publication tables
-                insert_into_table('resource_publication', {'resource_id':new_resource_id, 'publication_id':p.id}, conn=conn, engine=engine, debug=debug)
+            # create links between resource and publication tables
+            insert_link_rows('resource_publication', [(new_resource_id, p.id) for p in self.publications], conn=conn, engine=engine, debug=debug)
 
-        if self.grants:
+        if 'grants' not in deferred and self.grants:
             # delete_from_table('resource_grant', {'resource_id':new_resource_id}, conn=conn, engine=engine, debug=debug) # delete existing links
             for g in self.grants:
                 if not g.id or force:
                     new_grant_id = g.write(conn=conn, engine=engine, debug=debug)
                     g.id = new_grant_id
-                # create links between resource and grant tables
-                insert_into_table('resource_grant', {'resource_id':new_resource_id, 'grant_id':g.id}, conn=conn, engine=engine, debug=debug)
+            # create links between resource and grant tables
+            insert_link_rows('resource_grant', [(new_resource_id, g.id) for g in self.grants], conn=conn, engine=engine, debug=debug)
 
         return self.id
 
@@ -172,7 +185,7 @@ class Resource:
 
         return r_result
 
-    def fetch_by_id(resource_id: int, expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Resource:
+    def fetch_by_id(resource_id: int, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Resource:
         """Fetch Resource from database by ID.
 
         Args:
@@ -184,9 +197,9 @@ class Resource:
         Returns:
             The fetched Resource object.
         """
-        return fetch_resource({'id': resource_id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
+        return fetch_one_resource({'id': resource_id}, expanded=expanded, conn=conn, engine=engine, debug=debug)
 
-    def fetch_by_name(name: str, expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[list]:
+    def fetch_by_name(name: str, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[list]:
         """Fetch Resource from database by name. This will search short_name, common_name, and full_name fields.
 
         Args:
@@ -202,10 +215,6 @@ class Resource:
         cn_results = fetch_resource({'common_name': name, 'is_latest': 1}, expanded=expanded, conn=conn, engine=engine, debug=debug)
         fn_results = fetch_resource({'full_name': name, 'is_latest': 1}, expanded=expanded, conn=conn, engine=engine, debug=debug)
 
-        sn_results = sn_results if type(sn_results) is list else [sn_results] if sn_results else []
-        cn_results = cn_results if type(cn_results) is list else [cn_results] if cn_results else []
-        fn_results = fn_results if type(fn_results) is list else [fn_results] if fn_results else []
-
         combined_results = {r.id: r for r in (sn_results + cn_results + fn_results)}
         if len(combined_results) == 1:
             return list(combined_results.values())[0]
@@ -222,33 +231,45 @@ class Resource:
         """
         return self.url.is_online()
 
-    def accessions(self) -> list[Accession]:
+    def accessions(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None) -> list[Accession]:
         """Return list of Accession objects associated with this Resource.
 
+        Args:
+            conn (Optional[Connection], optional): SQLAlchemy Connection object (defaults to the one this Resource was fetched with; expanded fetches do not keep it, so pass one).
+            engine (Optional[Engine], optional): SQLAlchemy Engine object (defaults to the one this Resource was fetched with).
+
         Returns:
             List of Accession objects.
         """
-        return fetch_accession({'resource_id': self.id}, conn=self.__conn__, engine=self.__engine__, debug=False)
+        return fetch_accession({'resource_id': self.id}, conn=conn or self.__conn__, engine=engine or self.__engine__, debug=False)
 
-    def mentions(self) -> list[ResourceMention]:
+    def mentions(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None) -> list[ResourceMention]:
         """Return list of ResourceMention objects that mention this Resource.
 
+        Args:
+            conn (Optional[Connection], optional): SQLAlchemy Connection object (defaults to the one this Resource was fetched with; expanded fetches do not keep it, so pass one).
+            engine (Optional[Engine], optional): SQLAlchemy Engine object (defaults to the one this Resource was fetched with).
+
         Returns:
             List of ResourceMention objects.
         """
-        return fetch_resource_mention({'resource_id': self.id}, conn=self.__conn__, engine=self.__engine__, debug=False)
+        return fetch_resource_mention({'resource_id': self.id}, conn=conn or self.__conn__, engine=engine or self.__engine__, debug=False)
 
-    def referenced_by(self) -> list[Publication]:
+    def referenced_by(self, conn: Optional[Connection] = None, engine: Optional[Engine] = None) -> list[Publication]:
         """Return list of Publication objects that reference this Resource either via an Accession or a ResourceMention.
 
+        Args:
+            conn (Optional[Connection], optional): SQLAlchemy Connection object (defaults to the one this Resource was fetched with; expanded fetches do not keep it, so pass one).
+            engine (Optional[Engine], optional): SQLAlchemy Engine object (defaults to the one this Resource was fetched with).
+
         Returns:
             List of Publication objects.
         """
         refs = {}
-        for acc in self.accessions():
+        for acc in self.accessions(conn=conn, engine=engine):
             for pub in acc.publications:
                 refs[pub.id] = pub
 
-        for mention in self.mentions():
+        for mention in self.mentions(conn=conn, engine=engine):
             refs[mention.publication.id] = mention.publication
         return list(refs.values())
@@ -6,7 +6,7 @@ from .resource import Resource
 from .version import Version
 
 from .utils import extract_fields_by_type
-from .utils_db import insert_into_table, delete_from_table
+from .utils_db import insert_resource_mention_bulk, delete_from_table
 from .utils_fetch import fetch_resource_mention
 
 from typing import Optional
@@ -85,16 +85,11 @@ class ResourceMention:
             ver_id = self.version.write(conn=conn, engine=engine, debug=debug)
             self.version.id = ver_id
 
-        for matched_alias in self.matched_aliases:
-            mention_cols = {
-                'publication_id': self.publication.id,
-                'resource_id': self.resource.id,
-                'version_id': self.version.id,
-                'matched_alias': matched_alias.matched_alias,
-                'match_count': matched_alias.match_count,
-                'mean_confidence': matched_alias.mean_confidence,
-            }
-            insert_into_table('resource_mention', mention_cols, conn=conn, engine=engine, debug=debug)
+        mention_rows = [
+            (self.publication.id, self.resource.id, self.version.id, ma.matched_alias, ma.match_count, ma.mean_confidence)
+            for ma in self.matched_aliases
+        ]
+        insert_resource_mention_bulk(mention_rows, conn=conn, engine=engine, debug=debug)
 
     def delete(self, conn=None, engine=None, debug=False):
         if conn is None:
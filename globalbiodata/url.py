@@ -1,13 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from .utils_db import insert_into_table, delete_from_table
-from .utils_fetch import fetch_url, fetch_connection_status
+from .utils_db import insert_into_table, delete_from_table, clear_latest
+from .utils_fetch import fetch_one_url, fetch_connection_status
 
 from typing import Optional
 from sqlalchemy.engine import Connection, Engine
 from datetime import datetime
-import sqlalchemy as db
 
 @dataclass
 class URL:
@@ -120,7 +119,7 @@ class URL:
         Returns:
             The fetched URL object.
         """
-        return fetch_url({'id': url_id}, conn=conn, engine=engine, debug=debug)
+        return fetch_one_url({'id': url_id}, conn=conn, engine=engine, debug=debug)
 
     def fetch_by_url(url: str, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[URL]:
         """Fetch URL from database by URL string.
@@ -132,9 +131,9 @@ class URL:
             debug (bool, optional): If `True`, print debug information.
 
         Returns:
-            The fetched URL object if one result, else list of URLs, else `None`.
+            The fetched URL object, or `None` if not found.
         """
-        return fetch_url({'url': url}, conn=conn, engine=engine, debug=debug)
+        return fetch_one_url({'url': url}, conn=conn, engine=engine, debug=debug)
 
 
     def latest_connection_status(self) -> ConnectionStatus:
@@ -143,15 +142,11 @@ class URL:
         Returns:
             The latest ConnectionStatus object or `None` if not found.
         """
-        if not self.status or len(self.status) == 0:
+        if not self.status:
             return None
-        latest_status = self.status[0]
-        if latest_status.is_latest != 1:
-            for s in self.status:
-                if s.is_latest == 1:
-                    latest_status = s
-                    break
-        return latest_status
+        # statuses fetched from the database are already ordered latest-first, so this
+        # returns on the first element; hand-built lists fall back to a scan
+        return next((s for s in self.status if s.is_latest == 1), self.status[0])
 
     def is_online(self) -> bool:
         """Return boolean describing whether URL is online based on latest ConnectionStatus.
@@ -214,9 +209,7 @@ class ConnectionStatus:
         """
         # update is_latest to 0 for other connection statuses
         if self.is_latest:
-            lconn = engine.connect()
-            lconn.execute(db.text(f"UPDATE connection_status SET is_latest = 0 WHERE url_id = {self.url_id}"))
-            lconn.commit()
+            clear_latest('connection_status', {'url_id':self.url_id}, conn=conn, engine=engine, debug=debug)
 
         insert_into_table('connection_status', self.__dict__, conn=conn, engine=engine, debug=debug)
 
@@ -1,15 +1,45 @@
 from __future__ import annotations
 
 import re
+import functools
+import threading
+import pycountry
 import locationtagger
 import googlemaps
 
+from gbcutils.cache import cache
+
 from .publication import Publication
 from .grant import Grant, GrantAgency
 
 # from .utils_db import select_from_table, insert_into_table, delete_from_table
 # from .utils_fetch import fetch_resource, fetch_url, fetch_version, fetch_publication, fetch_grant, fetch_grant_agency, fetch_accession, fetch_resource_mention
 
+# affiliation clean-up patterns, compiled once
+_EMAIL_RE = re.compile(r'\s*[\w\.]+@[\w\.]+\s*')
+_UK_POSTAL_RE = re.compile(r'\s?[A-Z]{1,2}[0-9R][0-9A-Z]? [0-9][A-Z]{2}')
+_USA_RE = re.compile(r'USA[\.]?$')
+_UK_RE = re.compile(r'UK[\.]?$')
+_PART_SPLIT_RE = re.compile(r'[,;]')
+
+# country names as locationtagger recognises them (pycountry name / official name), lowercased, to the pycountry name
+_country_gazetteer = {
+    n.lower(): c.name for c in pycountry.countries for n in (c.name, getattr(c, 'official_name', None)) if n
+}
+# country names that are also region names (e.g. Georgia, the US state) - left to locationtagger
+_ambiguous_country_names = {sd.name.lower() for sd in pycountry.subdivisions} & _country_gazetteer.keys()
+
+def _gazetteer_country(s):
+    # the country named by the last part of an affiliation, when that is unambiguous :
+    # not also a region name, and no other part of the affiliation names a different country
+    parts = [p.strip().rstrip('.').strip().lower() for p in _PART_SPLIT_RE.split(s)]
+    country = _country_gazetteer.get(parts[-1])
+    if country is None or parts[-1] in _ambiguous_country_names:
+        return None
+    if any(_country_gazetteer.get(p, country) != country for p in parts[:-1]):
+        return None
+    return country
+
 
 def extract_fields_by_type(data: dict, type_prefix: str) -> dict:
     """Extract fields from a dictionary that start with a given prefix.
@@ -21,11 +51,8 @@ def extract_fields_by_type(data: dict, type_prefix: str) -> dict:
     Returns:
         Dictionary with extracted fields.
     """
-    extracted = {}
-    for k, v in data.items():
-        if k.startswith(f"{type_prefix}_"):
-            extracted[re.sub(f"^{type_prefix}_", "", k)] = v
-    return extracted
+    prefix = f"{type_prefix}_"
+    return {k[len(prefix):]: v for k, v in data.items() if k.startswith(prefix)}
 
 def new_publication_from_EuropePMC_result(epmc_result: dict, google_maps_api_key: str = None) -> Publication:
     """Create a new Publication object from an EuropePMC search result, including additional geographic metadata enrichment.
@@ -82,50 +109,58 @@ def _extract_keywords(metadata):
 
     return keywords
 
+@functools.lru_cache(maxsize=100_000)
 def _clean_affiliation(s):
     # format and replace common abbreviations
-    s = re.sub(r'\s*[\w\.]+@[\w\.]+\s*', '', s) # remove email addresses & surrounding whitespace
-    s = re.sub(r'\s?[A-Z]{1,2}[0-9R][0-9A-Z]? [0-9][A-Z]{2}', '', s) # remove UK postal codes
-    s = re.sub(r';', ',', s) # unify delimiters
+    s = _EMAIL_RE.sub('', s) # remove email addresses & surrounding whitespace
+    s = _UK_POSTAL_RE.sub('', s) # remove UK postal codes
+    s = s.replace(';', ',') # unify delimiters
     s = ', '.join([x.strip() for x in s.split(',') if x.strip()]) # remove excess whitespace around commas
-    s = re.sub(r'USA[\.]?$', 'United States', s)
-    s = re.sub(r'UK[\.]?$', 'United Kingdom', s)
+    s = _USA_RE.sub('United States', s)
+    s = _UK_RE.sub('United Kingdom', s)
     return s
 
+_custom_country_mappings = {
+    "People's Republic of China": "China", "Macao": "China",
+    "United States of America": "United States", 'Russian Federation': 'Russia',
+    'Kingdom of Saudi Arabia': 'Saudi Arabia', 'Republic of Singapore': 'Singapore'
+}
+
 # pull author affiliations and identify countries
 def _extract_affiliations(metadata, google_maps_api_key=None):
-    # extract author affiliations & countries
-    affiliations, countries = [], []
-    affiliation_dict, countries_dict = {}, {}
-    custom_country_mappings = {
-        "People's Republic of China": "China", "Macao": "China",
-        "United States of America": "United States", 'Russian Federation': 'Russia',
-        'Kingdom of Saudi Arabia': 'Saudi Arabia', 'Republic of Singapore': 'Singapore'
-    }
-
+    # collect unique cleaned affiliations first (in order), so each is geolocated once
     try:
         author_list = metadata['authorList']['author']
+        affiliation_dict = {}
         for author in author_list:
             affiliation_list = author.get('authorAffiliationDetailsList', {}).get('authorAffiliation', [])
             for a in affiliation_list:
                 clean_a = _clean_affiliation(a['affiliation'])
-                if not clean_a or clean_a in affiliation_dict:
-                    continue
-                affiliation_dict[clean_a] = 1
-                a_countries = _find_country(clean_a, google_maps_api_key=google_maps_api_key)
-                countries_dict.update({(custom_country_mappings.get(x) or x):1 for x in a_countries[0]})
-        affiliations = list(affiliation_dict.keys())
-        countries = sorted(list(countries_dict.keys()))
+                if clean_a:
+                    affiliation_dict[clean_a] = 1
     except KeyError:
-        pass
+        return [], []
+
+    countries = set()
+    for clean_a in affiliation_dict:
+        a_countries, _ = _find_country_cached(clean_a, google_maps_api_key=google_maps_api_key)
+        countries.update(_custom_country_mappings.get(x) or x for x in a_countries)
 
-    return affiliations, countries
+    return list(affiliation_dict), sorted(countries)
 
+# keyed on the cleaned affiliation, and on whether Google Maps was available to disambiguate
+# (bump the version whenever the lookup logic changes, so stale results are not reused)
+@cache.memoize(key=lambda s, google_maps_api_key=None: ('find_country', 3, s, bool(google_maps_api_key)))
 def _find_country(s, google_maps_api_key=None):
     # print(f"Searching for countries in '{s}'")
     if not s:
         return ([], '')
 
+    # fast path : affiliations usually end with the country name verbatim
+    country = _gazetteer_country(s)
+    if country:
+        return ([country], 'gazetteer')
+
     # location search
     place_entity = locationtagger.find_locations(text = s)
     if place_entity.countries:
@@ -145,9 +180,23 @@ def _find_country(s, google_maps_api_key=None):
         else:
             return ([], '')
 
+# affiliation strings repeat heavily across records - skip repeat geocoding within a run
+@functools.lru_cache(maxsize=100_000)
+def _find_country_cached(s, google_maps_api_key=None):
+    return _find_country(s, google_maps_api_key=google_maps_api_key)
+
+# cap concurrent Google Maps requests when lookups run on a thread pool
+_gmaps_semaphore = threading.BoundedSemaphore(10)
+
+# one client (and its HTTP session) per API key, created on first use
+@functools.lru_cache(maxsize=None)
+def _gmaps_client(api_key):
+    return googlemaps.Client(key=api_key)
+
 def _advanced_geo_lookup(address, api_key=None):
-    gmaps = googlemaps.Client(key=api_key)
-    place_search = gmaps.find_place(address, "textquery", fields=["formatted_address", "place_id"])
+    gmaps = _gmaps_client(api_key)
+    with _gmaps_semaphore:
+        place_search = gmaps.find_place(address, "textquery", fields=["formatted_address", "place_id"])
     try:
         place_entity = locationtagger.find_locations(text = place_search['candidates'][0]['formatted_address'])
         return place_entity.countries
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import os
 import sys
+import json
+import tempfile
 import random
 import time
+import weakref
+import threading
+
+from contextlib import contextmanager
 
 import sqlalchemy as db
 from sqlalchemy.dialects.mysql import insert # for on_duplicate_key_update
 from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import OperationalError
 
-from typing import Optional
+from collections import OrderedDict
+from typing import Iterator, Optional
 
 # ---------------------------------------------------------------------------- #
 # Database helper methods                                                      #
@@ -67,6 +75,21 @@ def _fetch_id_from_unique_keys(table, data, conn, debug=False):
         raise ValueError(f"Entity not found in table {table.name} with unique keys: ", {k:v for k, v in data.items() if k in uniq_col_names})
     return result[0]
 
+def _fetch_committed_id(table, data, engine, debug=False):
+    # after a deadlock, the competing transaction has usually already committed the same
+    # unique key : read its id under a shared lock rather than re-attempting the insert
+    uniq_col_names = _get_unique_keys(table, engine)
+    if not uniq_col_names or 'id' not in table.columns or any(data.get(ucn) is None for ucn in uniq_col_names):
+        return None
+
+    wheres = [table.columns.get(ucn) == data[ucn] for ucn in uniq_col_names]
+    select = db.select(table.c.id).where(db.and_(*wheres)).with_for_update(read=True)
+    with engine.begin() as conn:
+        result = conn.execute(select).fetchone()
+    if debug and result is not None:
+        print(f"--> found committed id {result[0]} in {table.name} after deadlock")
+    return result[0] if result is not None else None
+
 def _remove_key_fields(table, conn, data): # also remove empty values
     key_names = _get_all_keys(table, conn)
     return {k:v for k, v in data.items() if (k not in key_names and v is not None)}
@@ -128,6 +151,169 @@ def _get_max_len(col_name, table_name, conn=None, engine=None):
 
     return _max_lens.get(col_key, None)
 
+def _filter_long_data(table_name, data, conn, engine=None, debug=False):
+    # move overlength strings to long_text and replace with reference token
+    for k, v in list(data.items()):
+        this_max_len = _get_max_len(k, table_name, conn=conn, engine=engine)
+        if v and this_max_len and isinstance(v, str) and len(v) > this_max_len:
+            longtext_id = insert_into_table('long_text', {'text': v}, conn=conn, engine=engine, debug=debug)
+            data[k] = f"long_text({longtext_id})"
+    return data
+
+def _upsert_row(table, data, pk_cols, conn, debug=False):
+    # execute the upsert on `conn` within whatever transaction is active and return the row id
+    insert_stmt = insert(table).values(data)
+    data_no_pks = _remove_key_fields(table, conn, data)
+
+    if data_no_pks:  # typical path: upsert (ON DUPLICATE KEY UPDATE)
+        if pk_cols and len(pk_cols) == 1:
+            # single primary key: use LAST_INSERT_ID() hack to get the id of existing row if no insert occurred
+            pk_name = pk_cols[0]
+            data_no_pks[pk_name] = db.func.last_insert_id(table.c[pk_name])
+
+        do_update_stmt = insert_stmt.on_duplicate_key_update(**data_no_pks)
+        if debug:
+            print(f"Updating {table.name} with data: {data_no_pks}")
+        result = conn.execute(do_update_stmt)
+    else:  # tables that are pure key rows
+        result = conn.execute(insert_stmt.prefix_with('IGNORE'))
+
+    inserted_pk = result.inserted_primary_key[0] if result.inserted_primary_key else None
+    affected_rows = result.rowcount
+
+    # Determine the resulting id to return
+    if (not inserted_pk) or (inserted_pk and affected_rows == 0):
+        # entity existed and was not updated
+        existing_id = conn.execute(db.text("SELECT LAST_INSERT_ID()")).scalar() if len(pk_cols) == 1 else _fetch_id_from_unique_keys(table, data, conn, debug=debug)
+        if debug:
+            print(f"Entity already exists. Fetched id: {existing_id}")
+        return existing_id
+    elif (inserted_pk and affected_rows > 1):
+        # entity existed and was updated (MySQL reports >1 affected rows on upsert-update)
+        if debug:
+            print(f"Entity already exists. Updated id: {inserted_pk}")
+        return inserted_pk
+
+    if debug:
+        print(f"New entity added. Inserted id: {inserted_pk}")
+    return inserted_pk
+
+# ---------------------------------------------------------------------------- #
+# Scoped fetch cache                                                           #
+# ---------------------------------------------------------------------------- #
+
+_fetch_cache_key = '_gbc_cache'
+_fetch_cache_maxsize = 4096
+_fetch_cache_events = ('begin', 'commit', 'rollback')
+
+@contextmanager
+def fetch_cache(conn: Connection) -> Iterator[None]:
+    """Share fetched objects by id across the `fetch_*` calls made on `conn` inside the block.
+
+    Repeated `{'id': ...}` lookups return the *same* object instances rather than
+    re-querying, so a change made to one of them is seen by every caller in the block.
+    The cache is emptied whenever a transaction begins, commits or rolls back on `conn`,
+    and whenever a write or delete goes through it; writes made through another
+    connection are not seen until then. Outside the block nothing is cached.
+
+    Args:
+        conn (Connection): Connection to cache fetches on.
+    """
+    if _fetch_cache_key in conn.info: # nested block: reuse the enclosing cache
+        yield
+        return
+
+    conn.info[_fetch_cache_key] = OrderedDict()
+    for name in _fetch_cache_events:
+        db.event.listen(conn, name, _clear_fetch_cache)
+    try:
+        yield
+    finally:
+        for name in _fetch_cache_events:
+            db.event.remove(conn, name, _clear_fetch_cache)
+        conn.info.pop(_fetch_cache_key, None)
+
+def _fetch_cache(conn):
+    # the cache opened by `fetch_cache` on `conn`, or `None` outside such a block
+    if conn is None:
+        return None
+    return conn.info.get(_fetch_cache_key)
+
+def _cache_key(table, id, variant):
+    # ids may arrive as strings from user input ('123'); key them as the integers the rows hold
+    if isinstance(id, str) and id.isdigit():
+        id = int(id)
+    return (table, id, variant)
+
+def _cache_get(cache, key):
+    obj = cache.get(key)
+    if obj is not None:
+        cache.move_to_end(key)
+    return obj
+
+def _cache_put(cache, key, obj):
+    cache[key] = obj
+    cache.move_to_end(key)
+    if len(cache) > _fetch_cache_maxsize:
+        cache.popitem(last=False)
+
+def _clear_fetch_cache(conn):
+    cache = _fetch_cache(conn)
+    if cache is not None:
+        cache.clear()
+
+
+# ---------------------------------------------------------------------------- #
+# Per-engine reflected tables                                                  #
+# ---------------------------------------------------------------------------- #
+
+_reflected_metadata = weakref.WeakKeyDictionary()
+_reflect_lock = threading.Lock()
+
+def _reflect_table(table_name, bind):
+    """Return the reflected `Table` for `table_name`, reflecting it at most once per engine.
+
+    Reusing the same `Table` object lets the engine's compiled-statement cache recognise
+    repeated queries (a freshly reflected table never matches a cached statement), and
+    skips the schema round-trips of reflecting again on every call.
+    """
+    engine = bind.engine if isinstance(bind, Connection) else bind
+    with _reflect_lock:
+        metadata_obj = _reflected_metadata.setdefault(engine, db.MetaData())
+        if table_name in metadata_obj.tables:
+            return metadata_obj.tables[table_name]
+        return db.Table(table_name, metadata_obj, autoload_with=bind)
+
+# id lists at least this long are sent as a single JSON array parameter rather than one bind per value
+_json_in_threshold = 50
+_json_in_chunk_size = 100_000
+
+def _in_clause(col, values, dialect_name, bind_name):
+    """Build `col IN (...)`, passing long value lists as table-valued JSON parameters.
+
+    SQLite expands the list with `json_each()` and MySQL 8 with `JSON_TABLE()`. Short lists
+    and other dialects fall back to a regular expanding `IN`. Very long lists are split into
+    chunks so that no single parameter grows without bound.
+    """
+    if len(values) < _json_in_threshold or dialect_name not in ('sqlite', 'mysql'):
+        return col.in_(values)
+
+    clauses = []
+    for i in range(0, len(values), _json_in_chunk_size):
+        chunk = values[i:i + _json_in_chunk_size]
+        json_chunk = json.dumps(chunk, default=str)
+        if dialect_name == 'sqlite':
+            json_values = db.func.json_each(db.bindparam(f"{bind_name}_{i}", json_chunk, type_=db.String)).table_valued('value')
+            clauses.append(col.in_(db.select(json_values.c.value)))
+        else:
+            sql_type = 'BIGINT' if all(isinstance(v, int) for v in chunk) else 'VARCHAR(255)'
+            json_table = db.text(
+                f"JSON_TABLE(:{bind_name}_{i}, '$[*]' COLUMNS (v {sql_type} PATH '$')) AS {bind_name}_{i}"
+            ).bindparams(db.bindparam(f"{bind_name}_{i}", json_chunk, type_=db.String))
+            clauses.append(col.in_(db.select(db.literal_column(f"{bind_name}_{i}.v")).select_from(json_table)))
+
+    return clauses[0] if len(clauses) == 1 else db.or_(*clauses)
+
 def insert_into_table(
     table_name: str,
     data: dict,
@@ -141,6 +327,12 @@ def insert_into_table(
 ) -> int:
     """Insert-or-update a row and return its id.
 
+    When a `conn` is provided, the statement runs inside the caller's transaction and
+    committing is left to the caller. Otherwise, each attempt runs in its own
+    `engine.begin()` transaction and is retried on deadlock. If a deadlock occurs
+    because another transaction has just inserted the same unique key, the id of
+    that committed row is returned instead of retrying.
+
     Args:
         table_name (str): Name of the table to insert into.
         data (dict): Dictionary of column names and values to insert.
@@ -155,19 +347,14 @@ def insert_into_table(
     Returns:
 		The ID/PK of the inserted or updated row.
     """
-    metadata_obj = db.MetaData()
-
-    conn_created = False
-    if conn is None:
-        if engine is None:
-            raise ValueError("insert_into_table requires either an engine or an open connection")
-        conn = engine.connect()
-        conn_created = True
-
-    # Reflect the table using the ENGINE (separate pooled connection) to avoid
-    # starting an implicit transaction on our working connection.
-    table = db.Table(table_name, metadata_obj, autoload_with=conn)
-    pk_cols = _get_primary_keys(table, conn)
+    if conn is None and engine is None:
+        raise ValueError("insert_into_table requires either an engine or an open connection")
+
+    # Reflect the table using the caller's connection, or a separate pooled
+    # connection from the engine when we are managing the transaction ourselves.
+    bind = conn if conn is not None else engine
+    table = _reflect_table(table_name, bind)
+    pk_cols = _get_primary_keys(table, bind)
     data = _stringify_data(data)
 
     if debug:
@@ -176,72 +363,23 @@ def insert_into_table(
         print(f"Columns: {', '.join(table.columns.keys())}")
         print(f"Primary keys: {', '.join(pk_cols)}")
 
-    # Optionally move overlength strings to long_text and replace with reference token
-    if filter_long_data:
-        for k, v in list(data.items()):
-            this_max_len = _get_max_len(k, table_name, conn=conn, engine=engine)
-            if v and this_max_len and isinstance(v, str) and len(v) > this_max_len:
-                longtext_id = insert_into_table('long_text', {'text': v}, conn=conn, engine=engine, debug=debug)
-                data[k] = f"long_text({longtext_id})"
-
-    # We "own" the transaction if we opened this connection in this function.
-    # Reflection above may have triggered an implicit txn elsewhere; don't let that
-    # disable retries. We manage our own explicit txn when we created the conn.
-    own_txn = conn_created
-    # print(f"conn_created={conn_created}, own_txn={own_txn}, conn.in_transaction()={conn.in_transaction()}")
-
-    # Retry loop only if we control our own transaction
+    # caller owns the connection (and its transaction) : no commit, no retries
+    if conn is not None:
+        _clear_fetch_cache(conn)
+        if filter_long_data:
+            data = _filter_long_data(table_name, data, conn, engine=engine, debug=debug)
+        return _upsert_row(table, data, pk_cols, conn, debug=debug)
+
+    # we own the transaction : commit/rollback is handled by engine.begin(), retry on deadlock
     attempts = 0
     while True:
         attempts += 1
-        # If we own the connection, start an explicit transaction only if one isn't already active
-        implicit_txn = conn.in_transaction()
-        trans = conn.begin() if (own_txn and not implicit_txn) else None
+        row = dict(data) # long data filtering mutates the row, so start each attempt afresh
         try:
-            insert_stmt = insert(table).values(data)
-            data_no_pks = _remove_key_fields(table, conn, data)
-
-            if data_no_pks:  # typical path: upsert (ON DUPLICATE KEY UPDATE)
-                if pk_cols and len(pk_cols) == 1:
-                    # single primary key: use LAST_INSERT_ID() hack to get the id of existing row if no insert occurred
-                    pk_name = pk_cols[0]
-                    data_no_pks[pk_name] = db.func.last_insert_id(table.c[pk_name])
-
-                do_update_stmt = insert_stmt.on_duplicate_key_update(**data_no_pks)
-                if debug:
-                    print(f"Updating {table_name} with data: {data_no_pks}")
-                result = conn.execute(do_update_stmt)
-            else:  # tables that are pure key rows
-                result = conn.execute(insert_stmt.prefix_with('IGNORE'))
-
-            if trans is not None:
-                trans.commit()
-            elif own_txn and implicit_txn and conn.in_transaction():
-                # We own the connection and were already in an implicit txn (likely started by prior metadata queries)
-                conn.commit()
-
-            inserted_pk = result.inserted_primary_key[0] if result.inserted_primary_key else None
-            affected_rows = result.rowcount
-
-            # Determine the resulting id to return
-            if (not inserted_pk) or (inserted_pk and affected_rows == 0):
-                # entity existed and was not updated
-                existing_id = conn.execute(db.text("SELECT LAST_INSERT_ID()")).scalar() if len(pk_cols) == 1 else _fetch_id_from_unique_keys(table, data, conn, debug=debug)
-                if debug:
-                    print(f"Entity already exists. Fetched id: {existing_id}")
-                this_id = existing_id
-            elif (inserted_pk and affected_rows > 1):
-                # entity existed and was updated (MySQL reports >1 affected rows on upsert-update)
-                this_id = inserted_pk
-                if debug:
-                    print(f"Entity already exists. Updated id: {this_id}")
-            else:
-                this_id = inserted_pk
-                if debug:
-                    print(f"New entity added. Inserted id: {this_id}")
-
-            # Success; break retry loop
-            break
+            with engine.begin() as txn_conn:
+                if filter_long_data:
+                    row = _filter_long_data(table_name, row, txn_conn, engine=engine, debug=debug)
+                return _upsert_row(table, row, pk_cols, txn_conn, debug=debug)
 
         except OperationalError as e:
             # MySQL deadlock / lock wait timeout codes
@@ -251,53 +389,177 @@ def insert_into_table(
             except Exception:
                 pass
 
-            if trans is not None:
-                try:
-                    trans.rollback()
-                except Exception:
-                    pass
-            elif own_txn and conn.in_transaction():
-                try:
-                    conn.rollback()
-                except Exception:
-                    pass
-
-            # If we don't own the transaction or retries disabled, re-raise immediately
-            if not own_txn or not retry_on_deadlock or code not in (1213, 1205):
+            if not retry_on_deadlock or code not in (1213, 1205) or attempts > max_retries:
                 raise
 
-            # Backoff and retry (we own the txn)
-            if attempts > max_retries:
-                raise
+            # on deadlock, the row we were racing to insert is likely committed already
+            if code == 1213:
+                committed_id = _fetch_committed_id(table, data, engine, debug=debug)
+                if committed_id:
+                    return committed_id
+
             # Exponential backoff with jitter
             delay = (base_delay * (2 ** (attempts - 1))) * (1 + 0.25 * random.random())
             if debug:
                 sys.stderr.write(f"[retry] {table_name}: OperationalError {code}; attempt {attempts}/{max_retries}; sleeping {delay:.2f}s\n")
             time.sleep(delay)
-            continue
 
         except Exception as e:
-            if trans is not None:
-                try:
-                    trans.rollback()
-                except Exception:
-                    pass
-            elif own_txn and conn.in_transaction():
-                try:
-                    conn.rollback()
-                except Exception:
-                    pass
             sys.stderr.write(f"Transaction rolled back due to: {e}\n")
             raise
-        finally:
-            if conn_created and own_txn and not conn.closed:
-                # keep connection open for caller if they provided it; otherwise close at end
-                pass
 
-    if conn_created:
-        conn.close()
+# ---------------------------------------------------------------------------- #
+# Bulk insert fast paths for high-volume tables with a fixed schema            #
+# ---------------------------------------------------------------------------- #
+
+# statements are built once at import from lightweight table clauses, so no
+# reflection, key lookup or per-row dict manipulation is needed at call time
+_resource_mention_cols = ['publication_id', 'resource_id', 'version_id', 'matched_alias', 'match_count', 'mean_confidence']
+_resource_mention_table = db.table('resource_mention', *[db.column(c) for c in _resource_mention_cols])
+_resource_mention_insert = insert(_resource_mention_table)
+_resource_mention_stmt = _resource_mention_insert.on_duplicate_key_update(
+    version_id=_resource_mention_insert.inserted.version_id,
+    match_count=_resource_mention_insert.inserted.match_count,
+    mean_confidence=_resource_mention_insert.inserted.mean_confidence,
+)
+
+# pure-key link tables : duplicate links are simply ignored
+_link_table_cols = {
+    'resource_publication': ['resource_id', 'publication_id'],
+    'resource_grant': ['resource_id', 'grant_id'],
+    'publication_grant': ['publication_id', 'grant_id'],
+    'accession_publication': ['accession', 'publication_id'],
+}
+_link_stmts = {
+    t: insert(db.table(t, *[db.column(c) for c in cols])).prefix_with('IGNORE')
+    for t, cols in _link_table_cols.items()
+}
+
+def _execute_many(stmt, params, conn=None, engine=None):
+    if conn is not None:
+        _clear_fetch_cache(conn)
+        return conn.execute(stmt, params).rowcount
+    if engine is None:
+        raise ValueError("bulk inserts require either an engine or an open connection")
+    with engine.begin() as txn_conn:
+        return txn_conn.execute(stmt, params).rowcount
+
+def _tsv_field(v):
+    # MySQL LOAD DATA defaults : backslash escapes, \N for NULL
+    if v is None:
+        return '\\N'
+    return str(v).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def _load_data_infile(table_name, cols, rows, duplicates, conn=None, engine=None):
+    # stream rows to a temporary TSV and ingest it server-side in one statement (MySQL only,
+    # needs `get_gbc_connection(..., local_infile=True)` - see gbcutils.db)
+    with tempfile.NamedTemporaryFile('w', suffix='.tsv', delete=False, encoding='utf-8', newline='') as fh:
+        for r in rows:
+            fh.write('\t'.join(_tsv_field(v) for v in r) + '\n')
+        tsv_path = fh.name
+
+    stmt = (
+        f"LOAD DATA LOCAL INFILE '{tsv_path}' {duplicates} INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(f'`{c}`' for c in cols)})"
+    )
+    try:
+        if conn is not None:
+            _clear_fetch_cache(conn)
+            return conn.exec_driver_sql(stmt).rowcount
+        if engine is None:
+            raise ValueError("bulk inserts require either an engine or an open connection")
+        with engine.begin() as txn_conn:
+            return txn_conn.exec_driver_sql(stmt).rowcount
+    finally:
+        os.remove(tsv_path)
+
+def insert_resource_mention_bulk(
+    rows: list,
+    conn: Optional[Connection] = None,
+    engine: Optional[Engine] = None,
+    debug: bool = False,
+    load_data: bool = False
+) -> int:
+    """Insert-or-update many resource_mention rows in a single executemany call.
+
+    Args:
+        rows (list): Tuples of (publication_id, resource_id, version_id, matched_alias, match_count, mean_confidence).
+        conn (Optional[Connection], optional): SQLAlchemy Connection object. Committing is left to the caller.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object. Used to open a transaction when no `conn` is given.
+        debug (bool, optional): If `True`, print debug information.
+        load_data (bool, optional): If `True`, ingest via MySQL `LOAD DATA LOCAL INFILE ... REPLACE` instead,
+            for large initial loads.
 
-    return this_id
+    Returns:
+		Number of affected rows, as reported by the driver.
+    """
+    if not rows:
+        return 0
+    if debug:
+        print(f"\n--> Bulk inserting {len(rows)} rows into table: resource_mention{' (LOAD DATA)' if load_data else ''}")
+    if load_data:
+        return _load_data_infile('resource_mention', _resource_mention_cols, rows, 'REPLACE', conn=conn, engine=engine)
+    params = [dict(zip(_resource_mention_cols, r)) for r in rows]
+    return _execute_many(_resource_mention_stmt, params, conn=conn, engine=engine)
+
+def insert_link_rows(
+    table_name: str,
+    rows: list,
+    conn: Optional[Connection] = None,
+    engine: Optional[Engine] = None,
+    debug: bool = False,
+    load_data: bool = False
+) -> int:
+    """Insert many rows into a pure-key link table, ignoring links that already exist.
+
+    Args:
+        table_name (str): One of resource_publication, resource_grant, publication_grant, accession_publication.
+        rows (list): Tuples of key values, in the table's primary key column order.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object. Committing is left to the caller.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object. Used to open a transaction when no `conn` is given.
+        debug (bool, optional): If `True`, print debug information.
+        load_data (bool, optional): If `True`, ingest via MySQL `LOAD DATA LOCAL INFILE ... IGNORE` instead,
+            for large initial loads.
+
+    Returns:
+		Number of inserted rows, as reported by the driver.
+    """
+    if table_name not in _link_stmts:
+        raise ValueError(f"No bulk insert statement defined for table: {table_name}")
+    if not rows:
+        return 0
+    cols = _link_table_cols[table_name]
+    if debug:
+        print(f"\n--> Bulk inserting {len(rows)} rows into table: {table_name}{' (LOAD DATA)' if load_data else ''}")
+    if load_data:
+        return _load_data_infile(table_name, cols, rows, 'IGNORE', conn=conn, engine=engine)
+    params = [dict(zip(cols, r)) for r in rows]
+    return _execute_many(_link_stmts[table_name], params, conn=conn, engine=engine)
+
+def clear_latest(
+    table_name: str,
+    data: dict,
+    conn: Optional[Connection] = None,
+    engine: Optional[Engine] = None,
+    debug: bool = False
+) -> int:
+    """Set `is_latest = 0` on all rows of a table matching the given column values.
+
+    Args:
+        table_name (str): Name of the table to update (must have an `is_latest` column).
+        data (dict): Dictionary of column names and values to match.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object. Committing is left to the caller.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object. Used to open a transaction when no `conn` is given.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		Number of updated rows, as reported by the driver.
+    """
+    table = db.table(table_name, db.column('is_latest'), *[db.column(c) for c in data.keys()])
+    stmt = db.update(table).where(db.and_(*[table.c[c] == v for c, v in data.items()])).values(is_latest=0)
+    if debug:
+        print(f"\n--> Clearing is_latest in table: {table_name} WHERE {data}")
+    return _execute_many(stmt, {}, conn=conn, engine=engine)
 
 def delete_from_table(
     table_name: str,
@@ -318,8 +580,6 @@ def delete_from_table(
     Returns:
 		Number of rows deleted.
     """
-    metadata_obj = db.MetaData()
-
     conn_created = False
     if conn is None:
         if engine is None:
@@ -328,8 +588,9 @@ def delete_from_table(
         conn_created = True
 
     # Reflect the table using the active connection
-    table = db.Table(table_name, metadata_obj, autoload_with=conn)
+    table = _reflect_table(table_name, conn)
     data = _stringify_data(data)
+    _clear_fetch_cache(conn)
 
     if debug:
         print(f"\n--> Deleting from table: {table_name} WHERE:")
@@ -353,6 +614,57 @@ def delete_from_table(
 
     return del_result.rowcount
 
+def _apply_filters(stmt, table, data, order_by, dialect_name):
+    # add WHERE clauses for `data` and ORDER BY for `order_by` (columns of `table`) to a select
+    wheres = [
+        _in_clause(table.columns.get(c), data[c], dialect_name, f"in_values_{i}") if isinstance(data[c], list)
+        else table.columns.get(c) == data[c]
+        for i, c in enumerate(data)
+    ]
+    if wheres:
+        stmt = stmt.where(db.and_(*wheres))
+    if order_by:
+        order_cols = [_order_col(table, col) for col in (order_by if isinstance(order_by, list) else [order_by])]
+        order_cols = [c for c in order_cols if c is not None]
+        if order_cols:
+            stmt = stmt.order_by(*order_cols)
+    return stmt
+
+def _order_col(table, name):
+    # a leading '-' sorts the column in descending order, e.g. '-date'
+    if name.startswith('-'):
+        col = table.columns.get(name[1:])
+        return col.desc() if col is not None else None
+    return table.columns.get(name)
+
+def _execute_raw(stmt, conn):
+    # execute a select on the DB-API cursor directly, skipping SQLAlchemy's Row construction;
+    # returns the rows as plain tuples, with each column's result processor applied where its
+    # type needs one (dates on SQLite, JSON, ...) so values match those of `conn.execute`
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={'render_postcompile': True})
+    params = [compiled.params[name] for name in compiled.positiontup] if compiled.positional else compiled.params
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(str(compiled), params)
+        rows = cursor.fetchall()
+        processors = []
+        for i, (col, desc) in enumerate(zip(stmt.selected_columns, cursor.description)):
+            proc = col.type.dialect_impl(conn.dialect).result_processor(conn.dialect, desc[1])
+            if proc is not None:
+                processors.append((i, proc))
+    finally:
+        cursor.close()
+
+    if not processors:
+        return rows
+    processed = []
+    for r in rows:
+        r = list(r)
+        for i, proc in processors:
+            r[i] = proc(r[i])
+        processed.append(r)
+    return processed
+
 def select_from_table(
     table_name: str,
     data: dict = {},
@@ -360,7 +672,8 @@ def select_from_table(
     order_by: list = None,
     conn: Optional[Connection] = None,
     engine: Optional[Engine] = None,
-    debug: bool = False
+    debug: bool = False,
+    raw: bool = False
 ) -> list:
     """Select rows from a table matching the provided data.
 
@@ -368,16 +681,15 @@ def select_from_table(
         table_name (str): Name of the table to select from.
         data (dict, optional): Dictionary of column names and values to match for selection.
         join_table (str, optional): Name of a table to join with.
-        order_by (list, optional): Column name(s) to order the results by.
+        order_by (list, optional): Column name(s) to order the results by; prefix a name with `-` for descending order.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
+        raw (bool, optional): If `True`, read rows via the DB-API cursor, bypassing SQLAlchemy's Row construction (column types are still processed).
 
     Returns:
 		List of dictionaries representing the selected rows.
     """
-    metadata_obj = db.MetaData()
-
     # Ensure we have a live connection before reflecting
     conn_created = False
     if conn is None:
@@ -387,9 +699,9 @@ def select_from_table(
         conn_created = True
 
     # Reflect using the active connection (works in SA 1.4/2.0)
-    table = db.Table(table_name, metadata_obj, autoload_with=conn)
+    table = _reflect_table(table_name, conn)
     if join_table:
-        join_tbl = db.Table(join_table, metadata_obj, autoload_with=conn)
+        join_tbl = _reflect_table(join_table, conn)
         table = table.join(join_tbl)
         # print("JOINED TABLE COLUMNS:", table.columns.keys())
 
@@ -397,30 +709,199 @@ def select_from_table(
         print(f"\n--> Selecting from table: {table_name} WHERE:")
         print('AND '.join([f"{k} == '{data[k]}'" for k in data.keys()]))
 
-    wheres = [
-        table.columns.get(c).in_(data[c]) if isinstance(data[c], list)
-        else table.columns.get(c) == data[c]
-        for c in data
-    ]
-
     # construct select statement with correct options
-    stmt = db.select(table)
-    if wheres:
-        stmt = stmt.where(db.and_(*wheres))
-    if order_by:
-        if isinstance(order_by, list):
-            order_cols = [table.columns.get(col) for col in order_by if table.columns.get(col) is not None]
-            if order_cols:
-                stmt = stmt.order_by(*order_cols)
-        else:
-            order_col = table.columns.get(order_by)
-            if order_col is not None:
-                stmt = stmt.order_by(order_col)
-    result = conn.execute(stmt).fetchall()
+    stmt = _apply_filters(db.select(table), table, data, order_by, conn.dialect.name)
+    result = _execute_raw(stmt, conn) if raw else conn.execute(stmt).fetchall()
 
     # convert result to list of dicts
-    d_result = [dict(zip(table.columns.keys(), list(r))) for r in result]
+    col_names = table.columns.keys()
+    d_result = [dict(zip(col_names, r)) for r in result]
+
+    if conn_created:
+        conn.close()
+    return d_result
+
+def iter_from_table(
+    table_name: str,
+    data: dict = {},
+    order_by: list = None,
+    batch_size: int = 1000,
+    conn: Optional[Connection] = None,
+    engine: Optional[Engine] = None,
+    debug: bool = False
+) -> Iterator[list]:
+    """Stream rows from a table matching the provided data through a server-side cursor, one batch at a time.
+
+    Args:
+        table_name (str): Name of the table to select from.
+        data (dict, optional): Dictionary of column names and values to match for selection.
+        order_by (list, optional): Column name(s) to order the results by; prefix a name with `-` for descending order.
+        batch_size (int, optional): Number of rows fetched from the cursor per batch.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		Iterator over lists of dictionaries representing the selected rows.
+    """
+    conn_created = False
+    if conn is None:
+        if engine is None:
+            raise ValueError("iter_from_table requires either an engine or an open connection")
+        conn = engine.connect()
+        conn_created = True
+
+    try:
+        table = _reflect_table(table_name, conn)
+
+        if debug:
+            print(f"\n--> Streaming from table: {table_name} WHERE:")
+            print('AND '.join([f"{k} == '{data[k]}'" for k in data.keys()]))
+
+        stmt = _apply_filters(db.select(table), table, data, order_by, conn.dialect.name)
+        col_names = table.columns.keys()
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(stmt)
+        try:
+            for batch in result.partitions():
+                yield [dict(zip(col_names, r)) for r in batch]
+        finally:
+            result.close()
+    finally:
+        if conn_created:
+            conn.close()
+
+def select_from_table_joined(
+    table_name: str,
+    joins: list,
+    data: dict = {},
+    order_by: list = None,
+    conn: Optional[Connection] = None,
+    engine: Optional[Engine] = None,
+    debug: bool = False,
+    raw: bool = False
+) -> list:
+    """Select rows from a table along with related rows from other tables, in a single LEFT JOIN query.
+
+    Args:
+        table_name (str): Name of the base table to select from.
+        joins (list): List of `(join_table, local_col, remote_col)` tuples, each joined as
+            `LEFT JOIN join_table ON table_name.local_col = join_table.remote_col`.
+        data (dict, optional): Dictionary of base table column names and values to match for selection.
+        order_by (list, optional): Base table column name(s) to order the results by; prefix a name with `-` for descending order.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+        raw (bool, optional): If `True`, read rows via the DB-API cursor, bypassing SQLAlchemy's Row construction.
+
+    Returns:
+		List of dictionaries keyed by table name, each holding that table's row as a dictionary
+        (or `None` where no joined row was found).
+    """
+    conn_created = False
+    if conn is None:
+        if engine is None:
+            raise ValueError("select_from_table_joined requires either an engine or an open connection")
+        conn = engine.connect()
+        conn_created = True
+
+    table = _reflect_table(table_name, conn)
+    tables = [table]
+    from_clause = table
+    for join_table, local_col, remote_col in joins:
+        join_tbl = _reflect_table(join_table, conn)
+        from_clause = from_clause.outerjoin(join_tbl, table.columns.get(local_col) == join_tbl.columns.get(remote_col))
+        tables.append(join_tbl)
+
+    if debug:
+        print(f"\n--> Selecting from table: {table_name} JOIN {', '.join(j[0] for j in joins)} WHERE:")
+        print('AND '.join([f"{k} == '{data[k]}'" for k in data.keys()]))
+
+    stmt = db.select(*[c for t in tables for c in t.columns]).select_from(from_clause)
+    stmt = _apply_filters(stmt, table, data, order_by, conn.dialect.name)
+    result = _execute_raw(stmt, conn) if raw else conn.execute(stmt).fetchall()
+
+    # split each flat row back into one dict per table
+    col_names = [(t.name, t.columns.keys()) for t in tables]
+    d_result = []
+    for r in result:
+        row, offset = {}, 0
+        for t_name, t_cols in col_names:
+            values = r[offset:offset + len(t_cols)]
+            row[t_name] = dict(zip(t_cols, values)) if any(v is not None for v in values) else None
+            offset += len(t_cols)
+        d_result.append(row)
+
+    if conn_created:
+        conn.close()
+    return d_result
+
+def _json_rows_agg(cols, dialect_name):
+    # aggregate `cols` of every row in a group into a JSON array of objects
+    pairs = [arg for c in cols for arg in (c.name, c)]
+    if dialect_name == 'sqlite':
+        return db.func.json_group_array(db.func.json_object(*pairs))
+    if dialect_name == 'postgresql':
+        return db.func.json_agg(db.func.json_build_object(*pairs))
+    return db.func.json_arrayagg(db.func.json_object(*pairs))
+
+def select_grouped_from_table(
+    table_name: str,
+    group_by: list,
+    data: dict = {},
+    sums: list = [],
+    means: list = [],
+    collect: list = [],
+    conn: Optional[Connection] = None,
+    engine: Optional[Engine] = None,
+    debug: bool = False
+) -> list:
+    """Select rows from a table matching the provided data, aggregated into one row per group in the database.
+
+    Args:
+        table_name (str): Name of the table to select from.
+        group_by (list): Column names to group by; groups are returned in this order.
+        data (dict, optional): Dictionary of column names and values to match for selection.
+        sums (list, optional): Column names to total per group, returned as `<col>_total`.
+        means (list, optional): Column names to average per group, returned as `<col>_mean`.
+        collect (list, optional): Column names gathered from each row of the group, returned under `rows`
+            as a list of dictionaries.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		List of dictionaries, one per group.
+    """
+    conn_created = False
+    if conn is None:
+        if engine is None:
+            raise ValueError("select_grouped_from_table requires either an engine or an open connection")
+        conn = engine.connect()
+        conn_created = True
+
+    table = _reflect_table(table_name, conn)
+
+    if debug:
+        print(f"\n--> Selecting from table: {table_name} GROUP BY {', '.join(group_by)} WHERE:")
+        print('AND '.join([f"{k} == '{data[k]}'" for k in data.keys()]))
+
+    group_cols = [table.columns.get(c) for c in group_by]
+    select_cols = list(group_cols)
+    select_cols += [db.func.sum(table.columns.get(c)).label(f"{c}_total") for c in sums]
+    select_cols += [db.func.avg(table.columns.get(c)).label(f"{c}_mean") for c in means]
+    if collect:
+        select_cols.append(_json_rows_agg([table.columns.get(c) for c in collect], conn.dialect.name).label('rows'))
+
+    stmt = _apply_filters(db.select(*select_cols), table, data, group_by, conn.dialect.name).group_by(*group_cols)
+    result = conn.execute(stmt).mappings().fetchall()
+
+    d_result = []
+    for r in result:
+        row = dict(r)
+        if collect:
+            row['rows'] = json.loads(row['rows']) if isinstance(row['rows'], (str, bytes)) else row['rows']
+        d_result.append(row)
 
     if conn_created:
         conn.close()
-    return d_result
\ No newline at end of file
+    return d_result
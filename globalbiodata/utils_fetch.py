@@ -1,70 +1,182 @@
 from __future__ import annotations
 
-import re
-from .utils_db import select_from_table
+from .utils_db import select_from_table, select_from_table_joined, select_grouped_from_table, iter_from_table, _fetch_cache, _cache_key, _cache_get, _cache_put
 
-from typing import Optional, TYPE_CHECKING
+from typing import Iterator, Optional
 from sqlalchemy.engine import Connection, Engine
 
-if TYPE_CHECKING: # to avoid circular imports
-    from .resource import Resource
-    from .url import URL, ConnectionStatus
-    from .version import Version
-    from .publication import Publication
-    from .grant import Grant, GrantAgency
+
+# ----------------------------------------------------------------------- #
+# Helpers for batching related-object lookups                             #
+# ----------------------------------------------------------------------- #
+
+def _one(results, kind, query):
+    # the single result of a fetch_one_* call, or None if nothing matched
+    if len(results) > 1:
+        raise ValueError(f"Expected at most one {kind} matching {query}, found {len(results)}")
+    return results[0] if results else None
+
+def _unique_ids(rows, col):
+    # distinct, non-null values of `col`, in first-seen order
+    return list(dict.fromkeys(r[col] for r in rows if r[col] is not None))
+
+def _index_by_id(objs, attr='id'):
+    return {getattr(o, attr): o for o in objs}
+
+def _cached_by_id(table, query, order_by, conn, fetch, variant=None):
+    # inside a `fetch_cache` block, serve `{'id': ...}` lookups from the cache, fetching only the ids
+    # not seen yet. `fetch` takes a query dict and returns a list of objects; other queries bypass the cache.
+    cache = _fetch_cache(conn)
+    if cache is None or order_by != 'id' or list(query.keys()) != ['id']:
+        return fetch(query)
+
+    ids = query['id'] if isinstance(query['id'], list) else [query['id']]
+    found, missing = {}, []
+    for i in dict.fromkeys(ids):
+        obj = _cache_get(cache, _cache_key(table, i, variant))
+        if obj is None:
+            missing.append(i)
+        else:
+            found[obj.id] = obj
+
+    if missing:
+        for obj in fetch({'id':missing}):
+            _cache_put(cache, _cache_key(table, obj.id, variant), obj)
+            found[obj.id] = obj
+
+    return sorted(found.values(), key=lambda o: o.id)
+
+def _statuses_by_url(url_ids, conn=None, engine=None, debug=False):
+    # fetch connection statuses for all urls in one query, grouped by url with the latest first
+    statuses = fetch_connection_status({'url_id':url_ids}, order_by=['-is_latest', '-date'], conn=conn, engine=engine, debug=debug) if url_ids else []
+    grouped = {}
+    for cs in statuses:
+        grouped.setdefault(cs.url_id, []).append(cs)
+    return grouped
+
+_accession_publication_prefix = 'accession_publication_'
+_accession_prefix = 'accession_'
+
+def _strip_accession_prefix(key):
+    if key.startswith(_accession_publication_prefix):
+        return key[len(_accession_publication_prefix):]
+    if key.startswith(_accession_prefix):
+        return key[len(_accession_prefix):]
+    return key
+
+def _defer(obj, *names):
+    # leave `names` unset on an unexpanded object so its __getattr__ loads them on first access
+    for name in names:
+        obj.__dict__.pop(name, None)
+    obj.__dict__['__deferred__'] = set(names)
+    return obj
+
+def _fetch_linked(link_table, parent_col, child_col, parent_id, fetch, conn=None, engine=None, debug=False):
+    # fetch the objects linked to a single parent row through `link_table`, in child id order
+    links = select_from_table(link_table, {parent_col:parent_id}, order_by=child_col, conn=conn, engine=engine, debug=debug)
+    child_ids = _unique_ids(links, child_col)
+    return fetch({'id':child_ids}, conn=conn, engine=engine, debug=debug) if child_ids else []
+
+def _group_ids(rows, parent_col, child_col):
+    # map each parent id to the list of its linked child ids
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[parent_col], []).append(row[child_col])
+    return grouped
+
+def _linked(parent_id, child_ids_by_parent, children_by_id):
+    # the fetched children of one parent, resolved through the id indexes built once per fetch call
+    return [children_by_id[c] for c in child_ids_by_parent.get(parent_id, ()) if c in children_by_id]
 
 
 # ----------------------------------------------------------------------- #
 # Fetcher methods for Global Biodata Resource data                        #
 # ----------------------------------------------------------------------- #
 
-def fetch_resource(query: dict, order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Resource]:
+def fetch_resource(query: dict, order_by: str = 'id', expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[Resource]:
     """Fetch Resource(s) from the database matching the provided query.
 
     Args:
         query (dict): Dictionary of column names and values to match for selection.
         order_by (str, optional): Column name(s) to order the results by.
-        expanded (bool, optional): If `True`, fetch associated publications and grants.
+        expanded (bool, optional): If `True`, fetch associated publications and grants up front; otherwise they are loaded on first access.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-        single Resource object (where single result if found), or list of Resource objects if found, else `None`.
+        List of Resource objects (empty if none found).
     """
-    from .resource import Resource
+    return _cached_by_id('resource', query, order_by, conn, lambda q: _fetch_resources(q, order_by, expanded, conn, engine, debug), variant=expanded)
+
+def fetch_one_resource(query: dict, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Resource]:
+    """Fetch the single Resource from the database matching the provided query.
+
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        expanded (bool, optional): If `True`, fetch associated publications and grants up front; otherwise they are loaded on first access.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
 
-    resource_raw = select_from_table('resource', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
-    if len(resource_raw) == 0:
-        return None
+    Returns:
+		The matching Resource object, or `None` if not found. Raises `ValueError` if more than one matches.
+    """
+    return _one(fetch_resource(query, expanded=expanded, conn=conn, engine=engine, debug=debug), 'Resource', query)
+
+def _fetch_resources(query, order_by, expanded, conn, engine, debug, raw=False):
+    # resource, url and version rows come back together from a single joined query
+    joined_raw = select_from_table_joined(
+        'resource', [('url', 'url_id', 'id'), ('version', 'version_id', 'id')],
+        query, order_by=order_by, conn=conn, engine=engine, debug=debug, raw=raw
+    )
+    if len(joined_raw) == 0:
+        return []
+
+    resource_raw = [j['resource'] for j in joined_raw]
+    statuses_by_url = _statuses_by_url(_unique_ids(resource_raw, 'url_id'), conn=conn, engine=engine, debug=debug)
+
+    if expanded:
+        resource_ids = [r['id'] for r in resource_raw]
+
+        pub_links = select_from_table('resource_publication', {'resource_id':resource_ids}, order_by='publication_id', conn=conn, engine=engine, debug=debug)
+        pub_ids_by_resource = _group_ids(pub_links, 'resource_id', 'publication_id')
+        pub_ids = _unique_ids(pub_links, 'publication_id')
+        pubs_by_id = _index_by_id(fetch_publication({'id':pub_ids}, conn=conn, engine=engine, debug=debug)) if pub_ids else {}
+
+        grant_links = select_from_table('resource_grant', {'resource_id':resource_ids}, order_by='grant_id', conn=conn, engine=engine, debug=debug)
+        grant_ids_by_resource = _group_ids(grant_links, 'resource_id', 'grant_id')
+        grant_ids = _unique_ids(grant_links, 'grant_id')
+        grants_by_id = _index_by_id(fetch_grant({'id':grant_ids}, conn=conn, engine=engine, debug=debug)) if grant_ids else {}
 
     resources = []
-    for r in resource_raw:
-        r['url'] = fetch_url({'id':r['url_id']}, conn=conn, engine=engine, debug=debug)
-        r['version'] = fetch_version({'id':r['version_id']}, conn=conn, engine=engine, debug=debug)
+    for j, r in zip(joined_raw, resource_raw):
+        if j['url'] is not None:
+            j['url']['status'] = statuses_by_url.get(j['url']['id'], [])
+            r['url'] = URL(j['url'])
+        else:
+            r['url'] = None
+        r['version'] = Version(j['version']) if j['version'] is not None else None
 
         if expanded:
-            pub_ids = select_from_table('resource_publication', {'resource_id':r['id']}, conn=conn, engine=engine, debug=debug)
-            r['publications'] = fetch_publication({'id':[p['publication_id'] for p in pub_ids]}, conn=conn, engine=engine, debug=debug)
-            r['publications'] = [r['publications']] if type(r['publications']) is not list else r['publications']
-
-            grant_ids = select_from_table('resource_grant', {'resource_id':r['id']}, conn=conn, engine=engine, debug=debug)
-            r['grants'] = fetch_grant({'id':[g['grant_id'] for g in grant_ids]}, conn=conn, engine=engine, debug=debug)
-            r['grants'] = [r['grants']] if (r['grants'] is not None and type(r['grants']) is not list) else r['grants']
+            r['publications'] = _linked(r['id'], pub_ids_by_resource, pubs_by_id)
+            r['grants'] = _linked(r['id'], grant_ids_by_resource, grants_by_id)
 
-        r['__conn__'] = conn
-        r['__engine__'] = engine
+        if not expanded:
+            # only lazily-loaded resources need to hold on to the connection
+            r['__conn__'] = conn
+            r['__engine__'] = engine
 
-        resources.append(Resource(r))
+        resources.append(Resource(r) if expanded else _defer(Resource(r), 'publications', 'grants'))
 
-    return resources if len(resources) > 1 else resources[0]
+    return resources
 
-def fetch_all_resources(order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
-    """Fetch all Resources from the database.
+def fetch_all_resources(order_by: str = 'id', expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
+    """Fetch all Resources from the database. Use `iter_all_resources` to stream large tables instead.
 
     Args:
         order_by (str, optional): Column name(s) to order the results by.
-        expanded (bool, optional): If `True`, fetch associated publications and grants.
+        expanded (bool, optional): If `True`, fetch associated publications and grants up front; otherwise they are loaded on first access.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
@@ -72,14 +184,38 @@ def fetch_all_resources(order_by: str = 'id', expanded: bool = True, conn: Optio
     Returns:
         List of Resource objects.
     """
-    return fetch_resource({}, order_by=order_by, expanded=expanded, conn=conn, engine=engine, debug=debug)
+    # full-table loads read rows straight from the DB-API cursor
+    return _fetch_resources({}, order_by, expanded, conn, engine, debug, raw=True)
+
+def iter_all_resources(order_by: str = 'id', expanded: bool = False, batch_size: int = 1000, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Iterator[Resource]:
+    """Iterate over all Resources in the database, streaming resource rows from a server-side cursor and
+    building one batch of Resources (with their URLs, versions and, if expanded, links) at a time.
+
+    As with `iter_all_publications`, rows are streamed on a connection checked out from `engine` (or `conn.engine`)
+    only for the stream, leaving `conn` free for the per-batch queries.
+
+    Args:
+        order_by (str, optional): Column name(s) to order the results by.
+        expanded (bool, optional): If `True`, fetch associated publications and grants for each batch; otherwise they are loaded on first access.
+        batch_size (int, optional): Number of resources read from the cursor per batch.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		Iterator of Resource objects.
+    """
+    # MySQL cannot run other queries on a connection with an open unbuffered cursor, so never stream on `conn`
+    stream_engine = engine if engine is not None else getattr(conn, 'engine', None)
+    for resource_raw in iter_from_table('resource', {}, order_by=order_by, batch_size=batch_size, engine=stream_engine, debug=debug):
+        yield from _fetch_resources({'id':[r['id'] for r in resource_raw]}, order_by, expanded, conn, engine, debug)
 
-def fetch_all_online_resources(order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
+def fetch_all_online_resources(order_by: str = 'id', expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch all Resources from the database where online status is true.
 
     Args:
         order_by (str, optional): Column name(s) to order the results by.
-        expanded (bool, optional): If `True`, fetch associated publications and grants.
+        expanded (bool, optional): If `True`, fetch associated publications and grants up front; otherwise they are loaded on first access.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
@@ -90,7 +226,7 @@ def fetch_all_online_resources(order_by: str = 'id', expanded: bool = True, conn
     full_list = fetch_all_resources(order_by=order_by, expanded=expanded, conn=conn, engine=engine, debug=debug)
     return [r for r in full_list if r.is_online()]
 
-def fetch_url(query: dict, order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[URL]:
+def fetch_url(query: dict, order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[URL]:
     """Fetch URL(s) from the database matching the provided query.
 
     Args:
@@ -102,24 +238,41 @@ def fetch_url(query: dict, order_by: str = 'id', expanded: bool = True, conn: Op
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-        single URL object (where single result if found), or list of URL objects if found, else `None`.
+        List of URL objects (empty if none found).
     """
-    from .url import URL
+    return _cached_by_id('url', query, order_by, conn, lambda q: _fetch_urls(q, order_by, expanded, conn, engine, debug), variant=expanded)
+
+def fetch_one_url(query: dict, expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[URL]:
+    """Fetch the single URL from the database matching the provided query.
+
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        expanded (bool, optional): If `True`, fetch associated connection status.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
 
+    Returns:
+		The matching URL object, or `None` if not found. Raises `ValueError` if more than one matches.
+    """
+    return _one(fetch_url(query, expanded=expanded, conn=conn, engine=engine, debug=debug), 'URL', query)
+
+def _fetch_urls(query, order_by, expanded, conn, engine, debug):
     url_raw = select_from_table('url', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
     if len(url_raw) == 0:
-        return None
+        return []
+
+    if expanded:
+        statuses_by_url = _statuses_by_url([u['id'] for u in url_raw], conn=conn, engine=engine, debug=debug)
 
     urls = []
     for u in url_raw:
         if expanded:
-            u['status'] = fetch_connection_status({'url_id':u['id']}, order_by=['is_latest', 'date'], conn=conn, engine=engine, debug=debug)
-            u['status'] = [u['status']] if (u['status'] is not None and type(u['status']) is not list) else u['status']
-            u['status'] = u['status'][::-1] # reverse order to have latest first
+            u['status'] = statuses_by_url.get(u['id'], [])
 
         urls.append(URL(u))
 
-    return urls if len(urls) > 1 else urls[0]
+    return urls
 
 def fetch_all_urls(order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch all URLs from the database.
@@ -136,7 +289,7 @@ def fetch_all_urls(order_by: str = 'id', expanded: bool = True, conn: Optional[C
     """
     return fetch_url({}, order_by=order_by, expanded=expanded, conn=conn, engine=engine, debug=debug)
 
-def fetch_connection_status(query: dict, order_by: str = 'url_id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[ConnectionStatus]:
+def fetch_connection_status(query: dict, order_by: str = 'url_id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[ConnectionStatus]:
     """Fetch ConnectionStatus(es) from the database matching the provided query.
 
     Args:
@@ -147,17 +300,10 @@ def fetch_connection_status(query: dict, order_by: str = 'url_id', conn: Optiona
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-        single ConnectionStatus object (where single result if found), or list of ConnectionStatus objects if found, else `None`.
+        List of ConnectionStatus objects (empty if none found).
     """
-    from .url import ConnectionStatus
-
     status_raw = select_from_table('connection_status', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
-    if len(status_raw) == 0:
-        return None
-
-    conn_stats = [ConnectionStatus(cs) for cs in status_raw]
-
-    return conn_stats if len(conn_stats) > 1 else conn_stats[0]
+    return [ConnectionStatus(cs) for cs in status_raw]
 
 def fetch_all_connection_statuses(order_by: str = 'url_id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch all ConnectionStatuses from the database.
@@ -173,7 +319,7 @@ def fetch_all_connection_statuses(order_by: str = 'url_id', conn: Optional[Conne
     """
     return fetch_connection_status({}, order_by=order_by, conn=conn, engine=engine, debug=debug)
 
-def fetch_version(query: dict, order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Version]:
+def fetch_version(query: dict, order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[Version]:
     """Fetch Version(s) from the database matching the provided query.
 
     Args:
@@ -184,17 +330,27 @@ def fetch_version(query: dict, order_by: str = 'id', conn: Optional[Connection]
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-		single Version object (where single result if found), or list of Version objects if found, else `None`.
+		List of Version objects (empty if none found).
     """
-    from .version import Version
+    def _fetch_versions(q):
+        version_raw = select_from_table('version', q, order_by=order_by, conn=conn, engine=engine, debug=debug)
+        return [Version(p) for p in version_raw]
 
-    version_raw = select_from_table('version', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
-    if len(version_raw) == 0:
-        return None
+    return _cached_by_id('version', query, order_by, conn, _fetch_versions)
 
-    versions = [Version(p) for p in version_raw]
+def fetch_one_version(query: dict, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Version]:
+    """Fetch the single Version from the database matching the provided query.
 
-    return versions if len(versions) > 1 else versions[0]
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		The matching Version object, or `None` if not found. Raises `ValueError` if more than one matches.
+    """
+    return _one(fetch_version(query, conn=conn, engine=engine, debug=debug), 'Version', query)
 
 def fetch_all_versions(order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch all Versions from the database.
@@ -210,48 +366,71 @@ def fetch_all_versions(order_by: str = 'id', conn: Optional[Connection] = None,
     """
     return fetch_version({}, order_by=order_by, conn=conn, engine=engine, debug=debug)
 
-def fetch_publication(query: dict, order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Publication]:
+def fetch_publication(query: dict, order_by: str = 'id', expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[Publication]:
     """Fetch Publication(s) from the database matching the provided query.
 
     Args:
         query (dict): Dictionary of column names and values to match for selection.
         order_by (str, optional): Column name(s) to order the results by.
-        expanded (bool, optional): If `True`, fetch associated grants.
+        expanded (bool, optional): If `True`, fetch associated grants up front; otherwise they are loaded on first access.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		List of Publication objects (empty if none found).
+    """
+    return _cached_by_id('publication', query, order_by, conn, lambda q: _fetch_publications(q, order_by, expanded, conn, engine, debug), variant=expanded)
+
+def fetch_one_publication(query: dict, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Publication]:
+    """Fetch the single Publication from the database matching the provided query.
+
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        expanded (bool, optional): If `True`, fetch associated grants up front; otherwise they are loaded on first access.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-		single Publication object (where single result if found), or list of Publication objects if found, else `None`.
+		The matching Publication object, or `None` if not found. Raises `ValueError` if more than one matches.
     """
-    from .publication import Publication
+    return _one(fetch_publication(query, expanded=expanded, conn=conn, engine=engine, debug=debug), 'Publication', query)
 
-    publication_raw = select_from_table('publication', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
+def _fetch_publications(query, order_by, expanded, conn, engine, debug, raw=False):
+    publication_raw = select_from_table('publication', query, order_by=order_by, conn=conn, engine=engine, debug=debug, raw=raw)
     if len(publication_raw) == 0:
-        return None
+        return []
+
+    return _build_publications(publication_raw, expanded, conn, engine, debug)
+
+def _build_publications(publication_raw, expanded, conn, engine, debug):
+    if expanded:
+        # fetch grant links and grants for all publications at once
+        grant_links = select_from_table('publication_grant', {'publication_id':[p['id'] for p in publication_raw]}, order_by='grant_id', conn=conn, engine=engine, debug=debug)
+        grant_ids_by_pub = _group_ids(grant_links, 'publication_id', 'grant_id')
+        grant_ids = _unique_ids(grant_links, 'grant_id')
+        grants_by_id = _index_by_id(fetch_grant({'id':grant_ids}, conn=conn, engine=engine, debug=debug)) if grant_ids else {}
 
     publications = []
     for p in publication_raw:
         if expanded:
-            grant_ids = select_from_table('publication_grant', {'publication_id':p['id']}, conn=conn, engine=engine, debug=debug)
-            p['grants'] = fetch_grant({'id':[g['grant_id'] for g in grant_ids]}, conn=conn, engine=engine, debug=debug)
-            p['grants'] = [p['grants']] if (p['grants'] is not None and type(p['grants']) is not list) else p['grants']
+            p['grants'] = _linked(p['id'], grant_ids_by_pub, grants_by_id) or None
         else:
-            p['grants'] = None
-
-        p['__conn__'] = conn
-        p['__engine__'] = engine
+            # only lazily-loaded publications need to hold on to the connection
+            p['__conn__'] = conn
+            p['__engine__'] = engine
 
-        publications.append(Publication(p))
+        publications.append(Publication(p) if expanded else _defer(Publication(p), 'grants'))
 
-    return publications if len(publications) > 1 else publications[0]
+    return publications
 
-def fetch_all_publications(order_by: str = 'id', expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
-    """Fetch all Publications from the database.
+def fetch_all_publications(order_by: str = 'id', expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
+    """Fetch all Publications from the database. Use `iter_all_publications` to stream large tables instead.
 
     Args:
         order_by (str, optional): Column name(s) to order the results by.
-        expanded (bool, optional): If `True`, fetch associated grants.
+        expanded (bool, optional): If `True`, fetch associated grants up front; otherwise they are loaded on first access.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
@@ -259,33 +438,83 @@ def fetch_all_publications(order_by: str = 'id', expanded: bool = True, conn: Op
     Returns:
 		List of Publication objects.
     """
-    return fetch_publication({}, order_by=order_by, expanded=expanded, conn=conn, engine=engine, debug=debug)
+    # full-table loads read rows straight from the DB-API cursor
+    return _fetch_publications({}, order_by, expanded, conn, engine, debug, raw=True)
 
-def fetch_grant(query: dict, order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Grant]:
-    """Fetch Grant(s) from the database matching the provided query.
+def iter_all_publications(order_by: str = 'id', expanded: bool = False, batch_size: int = 1000, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Iterator[Publication]:
+    """Iterate over all Publications in the database, streaming rows from a server-side cursor so that
+    only one batch is held in memory at a time.
+
+    Rows are streamed on a connection checked out from `engine` (or `conn.engine`) only for the stream, leaving
+    `conn` free for the grant lookups made while iterating (MySQL cannot run other queries on a connection mid-stream).
 
     Args:
-        query (dict): Dictionary of column names and values to match for selection.
         order_by (str, optional): Column name(s) to order the results by.
+        expanded (bool, optional): If `True`, fetch associated grants for each batch; otherwise they are loaded on first access.
+        batch_size (int, optional): Number of publications read from the cursor per batch.
         conn (Optional[Connection], optional): SQLAlchemy Connection object.
         engine (Optional[Engine], optional): SQLAlchemy Engine object.
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-		single Grant object (where single result if found), or list of Grant objects if found, else `None`.
+		Iterator of Publication objects.
     """
-    from .grant import Grant
+    stream_engine = engine if engine is not None else getattr(conn, 'engine', None)
+    for publication_raw in iter_from_table('publication', {}, order_by=order_by, batch_size=batch_size, engine=stream_engine, debug=debug):
+        yield from _build_publications(publication_raw, expanded, conn, engine, debug)
 
-    grant_raw = select_from_table('grant', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
-    if len(grant_raw) == 0:
-        return None
+def fetch_grant(query: dict, order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[Grant]:
+    """Fetch Grant(s) from the database matching the provided query.
 
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        order_by (str, optional): Column name(s) to order the results by.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		List of Grant objects (empty if none found).
+    """
+    # each grant has at most one agency, so join it in rather than fetching agencies separately
+    joined_raw = select_from_table_joined(
+        'grant', [('grant_agency', 'grant_agency_id', 'id')],
+        query, order_by=order_by, conn=conn, engine=engine, debug=debug
+    )
+    if len(joined_raw) == 0:
+        return []
+
+    # one GrantAgency object per id, shared with fetch_grant_agency inside a `fetch_cache` block
+    cache = _fetch_cache(conn)
+    agencies_by_id = {}
     grants = []
-    for g in grant_raw:
-        g['grant_agency'] = fetch_grant_agency({'id':g['grant_agency_id']}, conn=conn, engine=engine, debug=debug)
+    for j in joined_raw:
+        g, ga = j['grant'], j['grant_agency']
+        if ga is not None and ga['id'] not in agencies_by_id:
+            agency = _cache_get(cache, _cache_key('grant_agency', ga['id'], None)) if cache is not None else None
+            if agency is None:
+                agency = GrantAgency(ga)
+                if cache is not None:
+                    _cache_put(cache, _cache_key('grant_agency', ga['id'], None), agency)
+            agencies_by_id[ga['id']] = agency
+        g['grant_agency'] = agencies_by_id.get(g['grant_agency_id'])
         grants.append(Grant(g))
 
-    return grants if len(grants) > 1 else grants[0]
+    return grants
+
+def fetch_one_grant(query: dict, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[Grant]:
+    """Fetch the single Grant from the database matching the provided query.
+
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		The matching Grant object, or `None` if not found. Raises `ValueError` if more than one matches.
+    """
+    return _one(fetch_grant(query, conn=conn, engine=engine, debug=debug), 'Grant', query)
 
 def fetch_all_grants(order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch all Grants from the database.
@@ -301,7 +530,7 @@ def fetch_all_grants(order_by: str = 'id', conn: Optional[Connection] = None, en
     """
     return fetch_grant({}, order_by=order_by, conn=conn, engine=engine, debug=debug)
 
-def fetch_grant_agency(query: dict, order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[GrantAgency]:
+def fetch_grant_agency(query: dict, order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list[GrantAgency]:
     """Fetch GrantAgency(s) from the database matching the provided query.
 
     Args:
@@ -312,17 +541,27 @@ def fetch_grant_agency(query: dict, order_by: str = 'id', conn: Optional[Connect
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-		single GrantAgency object (where single result if found), or list of GrantAgency objects if found, else `None`.
+		List of GrantAgency objects (empty if none found).
     """
-    from .grant import GrantAgency
+    def _fetch_grant_agencies(q):
+        grant_agency_raw = select_from_table('grant_agency', q, order_by=order_by, conn=conn, engine=engine, debug=debug)
+        return [GrantAgency(ga) for ga in grant_agency_raw]
 
-    grant_agency_raw = select_from_table('grant_agency', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
-    if len(grant_agency_raw) == 0:
-        return None
+    return _cached_by_id('grant_agency', query, order_by, conn, _fetch_grant_agencies)
 
-    grant_agencies = [GrantAgency(ga) for ga in grant_agency_raw]
+def fetch_one_grant_agency(query: dict, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[GrantAgency]:
+    """Fetch the single GrantAgency from the database matching the provided query.
 
-    return grant_agencies if len(grant_agencies) > 1 else grant_agencies[0]
+    Args:
+        query (dict): Dictionary of column names and values to match for selection.
+        conn (Optional[Connection], optional): SQLAlchemy Connection object.
+        engine (Optional[Engine], optional): SQLAlchemy Engine object.
+        debug (bool, optional): If `True`, print debug information.
+
+    Returns:
+		The matching GrantAgency object, or `None` if not found. Raises `ValueError` if more than one matches.
+    """
+    return _one(fetch_grant_agency(query, conn=conn, engine=engine, debug=debug), 'GrantAgency', query)
 
 def fetch_all_grant_agencies(order_by: str = 'id', conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch all GrantAgencies from the database.
@@ -338,7 +577,7 @@ def fetch_all_grant_agencies(order_by: str = 'id', conn: Optional[Connection] =
     """
     return fetch_grant_agency({}, order_by=order_by, conn=conn, engine=engine, debug=debug)
 
-def fetch_accession(query: dict, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[list]:
+def fetch_accession(query: dict, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch Accession(es) from the database matching the provided query.
 
     Args:
@@ -349,24 +588,20 @@ def fetch_accession(query: dict, expanded: bool = False, conn: Optional[Connecti
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-		list of Accession objects if found, else `None`.
+		List of Accession objects (empty if none found).
     """
-    from .accession import Accession
-
     # join accession and accession_publication tables to get publication IDs
     order_by = ["accession_resource_id", "accession_accession"]
     formatted_query = {f"accession_publication_{k}" if k =='publication_id' else f"accession_{k}": v for k, v in query.items() if v is not None}
     accession_raw = select_from_table('accession', formatted_query, join_table='accession_publication', order_by=order_by, conn=conn, engine=engine, debug=debug)
 
     # format column names to remove table prefixes added by sqlalchemy join
-    accession_results = []
-    for a in accession_raw:
-        af = {re.sub('^accession_publication_', '', k): v for k, v in a.items()}
-        af = {re.sub('^accession_', '', k): v for k, v in af.items()}
-        accession_results.append(af)
+    # (keys are identical across rows, so the rename map is computed once)
+    renamed_keys = [_strip_accession_prefix(k) for k in accession_raw[0].keys()] if accession_raw else []
+    accession_results = [dict(zip(renamed_keys, a.values())) for a in accession_raw]
 
     if len(accession_results) == 0:
-        return None
+        return []
 
     # group by accession to combine multiple publications
     grouped_accessions = {}
@@ -383,20 +618,28 @@ def fetch_accession(query: dict, expanded: bool = False, conn: Optional[Connecti
 
     sorted_accessions = sorted(grouped_accessions.keys()) # sort for consistent order (important for testing)
 
+    # fetch all distinct resources, versions and publications at once
+    groups = list(grouped_accessions.values())
+    resource_ids = _unique_ids(groups, 'resource_id')
+    resources_by_id = _index_by_id(fetch_resource({'id':resource_ids}, expanded=expanded, conn=conn, engine=engine, debug=debug)) if resource_ids else {}
+    version_ids = _unique_ids(groups, 'version_id')
+    versions_by_id = _index_by_id(fetch_version({'id':version_ids}, conn=conn, engine=engine, debug=debug)) if version_ids else {}
+    pub_ids = list(dict.fromkeys(p for g in groups for p in g['publications']))
+    pubs_by_id = _index_by_id(fetch_publication({'id':pub_ids}, expanded=expanded, conn=conn, engine=engine, debug=debug)) if pub_ids else {}
+
     # build component objects
     accessions = []
     for a in sorted_accessions:
-        a_obj = { 'accession': a, 'publications': [] }
-        a_obj['resource'] = fetch_resource({'id':grouped_accessions[a]['resource_id']}, expanded=expanded, conn=conn, engine=engine, debug=debug)
-        a_obj['version'] = fetch_version({'id':grouped_accessions[a]['version_id']}, conn=conn, engine=engine, debug=debug)
-        a_obj['publications'] = fetch_publication({'id':list(grouped_accessions[a]['publications'])}, expanded=expanded, conn=conn, engine=engine, debug=debug)
-        a_obj['publications'] = [a_obj['publications']] if type(a_obj['publications']) is not list else a_obj['publications']
+        a_obj = { 'accession': a }
+        a_obj['resource'] = resources_by_id.get(grouped_accessions[a]['resource_id'])
+        a_obj['version'] = versions_by_id.get(grouped_accessions[a]['version_id'])
+        a_obj['publications'] = [pubs_by_id[p] for p in sorted(grouped_accessions[a]['publications']) if p in pubs_by_id]
 
         accessions.append(Accession(a_obj))
 
     return accessions
 
-def fetch_resource_mention(query: dict, expanded: bool = True, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> Optional[list]:
+def fetch_resource_mention(query: dict, expanded: bool = False, conn: Optional[Connection] = None, engine: Optional[Engine] = None, debug: bool = False) -> list:
     """Fetch ResourceMention(s) from the database matching the provided query.
 
     Args:
@@ -407,73 +650,51 @@ def fetch_resource_mention(query: dict, expanded: bool = True, conn: Optional[Co
         debug (bool, optional): If `True`, print debug information.
 
     Returns:
-		list of ResourceMention objects if found, else `None`.
+		List of ResourceMention objects (empty if none found).
     """
-    from .resource_mention import ResourceMention, MatchedAlias
-
-    order_by = ['publication_id', 'resource_id', 'match_count']
-    mention_raw = select_from_table('resource_mention', query, order_by=order_by, conn=conn, engine=engine, debug=debug)
-    if len(mention_raw) == 0:
-        return None
-
-    # group by publication_id, resource_id, version_id to aggregate matched_aliases
-    mentions_grouped = {}
-    group_order = set()
-    for m in mention_raw:
-        m['mean_confidence'] = float(m['mean_confidence'])
-        m['match_count'] = int(m['match_count'])
-
-        key = (m['publication_id'], m['resource_id'], m['version_id'])
-        group_order.add(key)
-        if key not in mentions_grouped:
-            mentions_grouped[key] = {
-                'publication_id': m['publication_id'],
-                'resource_id': m['resource_id'],
-                'version_id': m['version_id'],
-                'matched_aliases': [],
-            }
-        mentions_grouped[key]['matched_aliases'].append(MatchedAlias({
-            'matched_alias': m['matched_alias'],
-            'match_count': m['match_count'],
-            'mean_confidence': m['mean_confidence']
-        }))
-    for k in mentions_grouped:
-        this_group_match_count, this_group_conf_sum, this_group_conf_n = 0, 0.0, 0
-        for ma in mentions_grouped[k]['matched_aliases']:
-            this_group_match_count += ma.match_count
-            this_group_conf_sum += ma.mean_confidence
-            this_group_conf_n += 1
-        mentions_grouped[k]['match_count'] = this_group_match_count
-        mentions_grouped[k]['mean_confidence'] = (this_group_conf_sum / this_group_conf_n) if this_group_conf_n > 0 else 0.0
+    # one row per (publication, resource, version), totalled and averaged by the database
+    mention_groups = select_grouped_from_table(
+        'resource_mention', ['publication_id', 'resource_id', 'version_id'], query,
+        sums=['match_count'], means=['mean_confidence'], collect=['matched_alias', 'match_count', 'mean_confidence'],
+        conn=conn, engine=engine, debug=debug
+    )
+    if len(mention_groups) == 0:
+        return []
+
+    # fetch all distinct publications, resources and versions at once
+    pubs_by_id = _index_by_id(fetch_publication({'id':_unique_ids(mention_groups, 'publication_id')}, expanded=expanded, conn=conn, engine=engine, debug=debug))
+    resources_by_id = _index_by_id(fetch_resource({'id':_unique_ids(mention_groups, 'resource_id')}, expanded=expanded, conn=conn, engine=engine, debug=debug))
+    version_ids = _unique_ids(mention_groups, 'version_id')
+    versions_by_id = _index_by_id(fetch_version({'id':version_ids}, conn=conn, engine=engine, debug=debug)) if version_ids else {}
 
     # build component objects
     mentions = []
-    cache = {}
-    for group_key in group_order:
-        m = mentions_grouped[group_key]
+    for m in mention_groups:
         m_obj = {}
-        if f"pub:{m['publication_id']}" in cache:
-            m_obj['publication'] = cache[f"pub:{m['publication_id']}"]
-        else:
-            m_obj['publication'] = fetch_publication({'id':m['publication_id']}, expanded=expanded, conn=conn, engine=engine, debug=debug)
-            cache[f"pub:{m['publication_id']}"] = m_obj['publication']
-
-        if f"res:{m['resource_id']}" in cache:
-            m_obj['resource'] = cache[f"res:{m['resource_id']}"]
-        else:
-            m_obj['resource'] = fetch_resource({'id':m['resource_id']}, expanded=expanded, conn=conn, engine=engine, debug=debug)
-            cache[f"res:{m['resource_id']}"] = m_obj['resource']
+        m_obj['publication'] = pubs_by_id.get(m['publication_id'])
+        m_obj['resource'] = resources_by_id.get(m['resource_id'])
+        m_obj['version'] = versions_by_id.get(m['version_id'])
+
+        aliases = sorted(m['rows'], key=lambda a: a['match_count'], reverse=True) # highest count first
+        m_obj['matched_aliases'] = [MatchedAlias({
+            'matched_alias': a['matched_alias'],
+            'match_count': int(a['match_count']),
+            'mean_confidence': float(a['mean_confidence'])
+        }) for a in aliases]
+        m_obj['match_count'] = int(m['match_count_total'])
+        m_obj['mean_confidence'] = float(m['mean_confidence_mean'])
 
-        if f"ver:{m['version_id']}" in cache:
-            m_obj['version'] = cache[f"ver:{m['version_id']}"]
-        else:
-            m_obj['version'] = fetch_version({'id':m['version_id']}, conn=conn, engine=engine, debug=debug)
-            cache[f"ver:{m['version_id']}"] = m_obj['version']
+        mentions.append(ResourceMention(m_obj))
 
-        m_obj['matched_aliases'] = m['matched_aliases'][::-1] # reverse order to have highest count first
-        m_obj['match_count'] = m['match_count']
-        m_obj['mean_confidence'] = m['mean_confidence']
+    return mentions
 
-        mentions.append(ResourceMention(m_obj))
 
-    return mentions
\ No newline at end of file
+# the model classes import the fetchers above, so they are imported once those are defined
+# (the package imports this module before any of the model modules)
+from .accession import Accession
+from .grant import Grant, GrantAgency
+from .publication import Publication
+from .resource import Resource
+from .resource_mention import ResourceMention, MatchedAlias
+from .url import URL, ConnectionStatus
+from .version import Version
@@ -2,12 +2,22 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from .utils_db import insert_into_table, delete_from_table
-from .utils_fetch import fetch_version
+from .utils_fetch import fetch_one_version
 
 from typing import Optional
 from sqlalchemy.engine import Connection, Engine
 from datetime import datetime, date
 
+def _parse_date(value):
+    # ISO dates take the C fast path; anything else falls back to strptime.
+    # date objects returned by the driver are passed through untouched
+    if not isinstance(value, str) or not value:
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
 @dataclass
 class Version:
     """
@@ -33,7 +43,7 @@ class Version:
         self.user = p.get('version_user') or p.get('user')
         self.additional_metadata = p.get('additional_version_metadata') or p.get('additional_metadata')
 
-        self.date = datetime.strptime(self.date, "%Y-%m-%d").date() if self.date and type(self.date) is str else self.date
+        self.date = _parse_date(self.date)
 
     def __str__(self):
         version_str = f"Version(id={self.id}, name={self.name}, date={self.date}, user={self.user}, additional_metadata={self.additional_metadata})"
@@ -86,4 +96,4 @@ class Version:
         Returns:
             The fetched Version object.
         """
-        return fetch_version({'id': version_id}, conn=conn, engine=engine, debug=debug)
\ No newline at end of file
+        return fetch_one_version({'id': version_id}, conn=conn, engine=engine, debug=debug)
\ No newline at end of file
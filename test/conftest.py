@@ -0,0 +1,85 @@
+import sqlite3
+import contextlib
+from unittest import mock
+
+import pytest
+import sqlalchemy as db
+
+import globalbiodata as gbc
+import globalbiodata.utils_db as gbc_utils_db
+
+test_db_path = './test/test_data/gbc_pytest_db.sqlite'
+
+@pytest.fixture(scope='session')
+def db_conn():
+    # copy the on-disk test database into memory once, then share one handle across the suite.
+    # under pytest-xdist each worker is its own process, so each gets a private in-memory copy
+    src = sqlite3.connect(f"file:{test_db_path}?mode=ro", uri=True)
+    mem = sqlite3.connect(':memory:', check_same_thread=False)
+    src.backup(mem)
+    src.close()
+    # the suite shares this copy across tests (and fixtures cache what they read), so refuse writes outright
+    mem.execute('PRAGMA query_only = ON')
+    mem.execute('PRAGMA temp_store = MEMORY')
+
+    engine = db.create_engine('sqlite://', creator=lambda: mem, poolclass=db.pool.StaticPool, query_cache_size=1200)
+    conn = engine.connect()
+    yield conn
+    conn.close()
+    engine.dispose()
+    mem.close()
+
+@pytest.fixture(scope='session')
+def all_data(db_conn):
+    # nothing writes to the test database, so each fetch_all_* only needs to run once per session
+    return {
+        'resources': gbc.fetch_all_resources(expanded=False, conn=db_conn),
+        'resources_expanded': gbc.fetch_all_resources(expanded=True, conn=db_conn),
+        'versions': gbc.fetch_all_versions(conn=db_conn),
+        'urls': gbc.fetch_all_urls(conn=db_conn),
+        'publications': gbc.fetch_all_publications(expanded=False, conn=db_conn),
+        'publications_expanded': gbc.fetch_all_publications(expanded=True, conn=db_conn),
+        'grant_agencies': gbc.fetch_all_grant_agencies(conn=db_conn),
+    }
+
+@pytest.fixture(scope='session')
+def gbc_cache(all_data):
+    # expanded objects by id, for tests that only need a starting object rather than the fetch path itself
+    return {
+        'resources': {r.id: r for r in all_data['resources_expanded']},
+        'publications': {p.id: p for p in all_data['publications_expanded']},
+    }
+
+@pytest.fixture
+def count_queries():
+    # records the SQL statements run on a connection, for asserting per-fetch query budgets.
+    # raw=True selects go straight to the DB-API cursor without firing connection events, so count those too
+    @contextlib.contextmanager
+    def _count_queries(conn):
+        queries = []
+        def _record(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        execute_raw = gbc_utils_db._execute_raw
+        def _record_raw(stmt, raw_conn):
+            if raw_conn is conn:
+                queries.append(str(stmt))
+            return execute_raw(stmt, raw_conn)
+
+        db.event.listen(conn, 'before_cursor_execute', _record)
+        try:
+            with mock.patch.object(gbc_utils_db, '_execute_raw', _record_raw):
+                yield queries
+        finally:
+            db.event.remove(conn, 'before_cursor_execute', _record)
+    return _count_queries
+
+@pytest.fixture(autouse=True)
+def clear_geo_caches():
+    # the country lookup and Google Maps client caches are module-level, so a result or client cached
+    # by one test (under whatever patches it applied) must not leak into the next, whatever the run order
+    gbc.utils._find_country_cached.cache_clear()
+    gbc.utils._gmaps_client.cache_clear()
+    yield
+    gbc.utils._find_country_cached.cache_clear()
+    gbc.utils._gmaps_client.cache_clear()
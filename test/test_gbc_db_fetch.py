@@ -1,482 +1,407 @@
 import globalbiodata as gbc
-import sqlalchemy as db
+import pytest
 from datetime import datetime, date
 
-db_engine = db.create_engine('sqlite:///./test/test_data/gbc_pytest_db.sqlite')
-db_conn = db_engine.connect()
-metadata = db.MetaData()
+def _snap(obj, fields):
+    # one dict comparison per object: pytest still prints a field-by-field diff on failure
+    return {f: getattr(obj, f) for f in fields}
+
+publication_fields = ['title', 'authors', 'publication_date', 'affiliation', 'affiliation_countries', 'citation_count']
+publication_321 = {
+    'title': 'Publication about test resource', 'authors': 'A. Guy, C. Lady', 'publication_date': date(2025, 1, 10),
+    'affiliation': 'One place; Another place', 'affiliation_countries': 'Here; There', 'citation_count': 123,
+}
+publication_432 = {
+    'title': 'Another publication about stuff', 'authors': 'R. Bee', 'publication_date': date(2022, 7, 1),
+    'affiliation': 'Heartsville', 'affiliation_countries': 'Everywhere', 'citation_count': 3,
+}
+version_fields = ['id', 'name', 'user', 'date']
+version_1 = {'id': 1, 'name': 'v1.1.1', 'user': 'carlac', 'date': date(2025, 10, 17)}
+version_2 = {'id': 2, 'name': 'v1.1.2', 'user': 'carlac', 'date': date(2025, 10, 17)}
+version_3 = {'id': 3, 'name': 'v1.1.3', 'user': 'nobody', 'date': date(2025, 1, 1)}
+grant_agency_fields = ['id', 'name', 'country']
+grant_agency_456 = {'id': 456, 'name': 'Funder no. 1', 'country': 'Here'}
+grant_agency_567 = {'id': 567, 'name': 'Funder no. 2', 'country': 'There'}
+grant_123 = {'id': 123, 'ext_grant_id': 'ABC-123-Z'}
+grant_234 = {'id': 234, 'ext_grant_id': 'DEF-234-Y'}
+
+def _assert_grant(grant, expected, expected_agency):
+    assert isinstance(grant, gbc.Grant)
+    assert _snap(grant, ['id', 'ext_grant_id']) == expected
+    assert isinstance(grant.grant_agency, gbc.GrantAgency)
+    assert _snap(grant.grant_agency, grant_agency_fields) == expected_agency
 
 # Test cases for fetching **Resources** from the GBC database
-def test_resource_fetch_by_id():
-    resource = gbc.fetch_resource({'id':'123'}, expanded=False, conn=db_conn)
+def _assert_resource_123(resource, expanded):
+    assert _snap(resource, ['id', 'short_name', 'full_name']) == {
+        'id': 123, 'short_name': 'test_resource', 'full_name': 'I am a Test Resource'
+    }
 
-    assert resource.id == 123
-    assert resource.short_name == 'test_resource'
-    assert resource.full_name == 'I am a Test Resource'
-
-    assert type(resource.url) is gbc.URL
+    assert isinstance(resource.url, gbc.URL)
     assert resource.url.url == 'www.test-resource.org'
     assert type(resource.url.status) is list
-    assert type(resource.url.status[0]) is gbc.ConnectionStatus
-    assert resource.url.status[0].status == '404'
-    assert resource.url.status[0].is_online == 0
-
-    assert type(resource.version) is gbc.Version
-    assert resource.version.name == 'v1.1.1'
-    assert resource.version.user == 'carlac'
-    assert resource.version.date == date(2025, 10, 17)
-
-    assert resource.publications is None # not expanded
-
-def test_resource_expanded_fetch_by_id():
-    resource = gbc.fetch_resource({'id':'123'}, expanded=True, conn=db_conn)
-
-    assert resource.id == 123
-    assert resource.short_name == 'test_resource'
-    assert resource.full_name == 'I am a Test Resource'
-
-    assert type(resource.url) is gbc.URL
-    assert resource.url.url == 'www.test-resource.org'
-    assert type(resource.url.status) is list
-    assert type(resource.url.status[0]) is gbc.ConnectionStatus
-    assert resource.url.status[0].status == '404'
-    assert resource.url.status[0].is_online == 0
+    assert isinstance(resource.url.status[0], gbc.ConnectionStatus)
+    assert _snap(resource.url.status[0], ['status', 'is_online']) == {'status': '404', 'is_online': 0}
     assert resource.is_online() is False
 
-    assert type(resource.version) is gbc.Version
-    assert resource.version.name == 'v1.1.1'
-    assert resource.version.user == 'carlac'
-    assert resource.version.date == date(2025, 10, 17)
+    assert isinstance(resource.version, gbc.Version)
+    assert _snap(resource.version, ['name', 'user', 'date']) == {
+        'name': 'v1.1.1', 'user': 'carlac', 'date': date(2025, 10, 17)
+    }
+
+    if not expanded:
+        assert [p.id for p in resource.publications] == [321] # not expanded: loaded on first access
+        assert [g.id for g in resource.grants] == [123] # not expanded: loaded on first access
+        return
 
     assert type(resource.publications) is list
     assert len(resource.publications) == 1
-    assert type(resource.publications[0]) is gbc.Publication
-    assert resource.publications[0].id == 321
-    assert resource.publications[0].pubmed_id == 321123
-    assert resource.publications[0].pmc_id == 'PMC321123'
-    assert resource.publications[0].publication_date == date(2025, 1, 10)
-    assert resource.publications[0].title == 'Publication about test resource'
-    assert resource.publications[0].authors == 'A. Guy, C. Lady'
-    assert resource.publications[0].affiliation == 'One place; Another place'
-    assert resource.publications[0].affiliation_countries == 'Here; There'
-    assert resource.publications[0].citation_count == 123
-
-def test_resource_fetch_by_id_from_resource_obj():
+    assert isinstance(resource.publications[0], gbc.Publication)
+    assert _snap(resource.publications[0], ['id', 'pubmed_id', 'pmc_id', *publication_fields]) == {
+        'id': 321, 'pubmed_id': 321123, 'pmc_id': 'PMC321123', **publication_321
+    }
+
+@pytest.mark.parametrize('lookup,expanded', [
+    ({'id':'123'}, False),
+    ({'id':'123'}, True),
+    ({'short_name':'test_resource'}, False),
+])
+def test_resource_fetch(db_conn, lookup, expanded):
+    resource = gbc.fetch_one_resource(lookup, expanded=expanded, conn=db_conn)
+    _assert_resource_123(resource, expanded)
+
+def test_resource_fetch_by_id_from_resource_obj(db_conn):
     # test here can be a bit more minimal as fetch by id is already tested above
     resource = gbc.Resource.fetch_by_id(123, conn=db_conn)
-    assert resource.id == 123
-    assert resource.short_name == 'test_resource'
-    assert resource.full_name == 'I am a Test Resource'
-
-    assert type(resource.url) is gbc.URL
-    assert type(resource.version) is gbc.Version
-
-def test_resource_fetch_by_short_name():
-    resource = gbc.fetch_resource({'short_name':'test_resource'}, expanded=False, conn=db_conn)
+    assert (resource.id, resource.short_name, resource.full_name) == (123, 'test_resource', 'I am a Test Resource')
 
-    assert resource.id == 123
-    assert resource.short_name == 'test_resource'
-    assert resource.full_name == 'I am a Test Resource'
+    assert isinstance(resource.url, gbc.URL)
+    assert isinstance(resource.version, gbc.Version)
 
-    assert type(resource.url) is gbc.URL
-    assert resource.url.url == 'www.test-resource.org'
-    assert type(resource.url.status) is list
-    assert type(resource.url.status[0]) is gbc.ConnectionStatus
-    assert resource.url.status[0].status == '404'
-    assert resource.url.status[0].is_online == 0
-
-    assert type(resource.version) is gbc.Version
-    assert resource.version.name == 'v1.1.1'
-    assert resource.version.user == 'carlac'
-    assert resource.version.date == date(2025, 10, 17)
-
-def test_resource_fetch_by_name_from_resource_obj():
+def test_resource_fetch_by_name_from_resource_obj(db_conn):
     # test here can be a bit more minimal as fetch by name is already tested above
     resources1 = gbc.Resource.fetch_by_name('test_resource', conn=db_conn)
-    print(resources1)
-    assert type(resources1) is gbc.Resource
-    assert resources1.id == 123
-    assert resources1.short_name == 'test_resource'
-    assert resources1.full_name == 'I am a Test Resource'
-    assert type(resources1.url) is gbc.URL
-    assert type(resources1.version) is gbc.Version
+    assert isinstance(resources1, gbc.Resource)
+    assert (resources1.id, resources1.short_name, resources1.full_name) == (123, 'test_resource', 'I am a Test Resource')
+    assert isinstance(resources1.url, gbc.URL)
+    assert isinstance(resources1.version, gbc.Version)
 
 
     resources2 = gbc.Resource.fetch_by_name('Test Resource', conn=db_conn)
-    assert type(resources2) is gbc.Resource
-    assert resources2.id == 234
-    assert resources2.short_name == 'TESTR'
+    assert isinstance(resources2, gbc.Resource)
+    assert (resources2.id, resources2.short_name) == (234, 'TESTR')
+
+def test_fetch_resource_by_id_list(db_conn):
+    # several ids are fetched with one IN query
+    resources = gbc.fetch_resource({'id':[123, 234]}, expanded=True, conn=db_conn)
+
+    assert [r.id for r in resources] == [123, 234]
+    assert [r.short_name for r in resources] == ['test_resource', 'TESTR']
 
-def test_fetch_all_resources():
-    resources = gbc.fetch_all_resources(expanded=False, conn=db_conn)
+def test_only_lazy_fetches_keep_the_connection(db_conn):
+    # expanded objects have nothing left to load, so they do not hold on to the connection
+    assert gbc.fetch_one_resource({'id':123}, expanded=True, conn=db_conn).__conn__ is None
+    assert gbc.fetch_one_publication({'id':321}, expanded=True, conn=db_conn).__conn__ is None
+    assert gbc.fetch_one_resource({'id':123}, expanded=False, conn=db_conn).__conn__ is db_conn
+
+def test_fetch_all_resources(all_data):
+    resources = all_data['resources']
 
     assert type(resources) is list
     assert len(resources) == 2
 
-    assert resources[0].id == 123
-    assert resources[0].short_name == 'test_resource'
-    assert resources[0].common_name is None
-    assert resources[0].full_name == 'I am a Test Resource'
-    assert type(resources[0].url) is gbc.URL
-    assert resources[0].url.id == 123
-    assert resources[0].url.url == 'www.test-resource.org'
+    assert [(r.id, r.short_name, r.common_name, r.full_name) for r in resources] == [
+        (123, 'test_resource', None, 'I am a Test Resource'),
+        (234, 'TESTR', 'Test Resource', None),
+    ]
+    assert all(isinstance(r.url, gbc.URL) for r in resources)
+    assert [(r.url.id, r.url.url) for r in resources] == [(123, 'www.test-resource.org'), (234, 'www.testr.co.uk')]
+
+def test_iter_all_resources(db_conn):
+    # streamed in batches smaller than the table, yielding the same resources as fetch_all_resources
+    resources = list(gbc.iter_all_resources(expanded=True, batch_size=1, conn=db_conn))
+
+    assert [r.id for r in resources] == [123, 234]
+    assert [r.url.url for r in resources] == ['www.test-resource.org', 'www.testr.co.uk']
+    assert [p.id for p in resources[0].publications] == [321]
 
+def test_iter_all_resources_streams_on_own_connection(db_conn, count_queries):
+    # the unfiltered streaming select must not run on the caller's connection, which serves the batch queries
+    gbc.fetch_all_resources(conn=db_conn) # reflect the tables first
+    with count_queries(db_conn) as queries:
+        resources = list(gbc.iter_all_resources(batch_size=1, conn=db_conn))
 
-    assert resources[1].id == 234
-    assert resources[1].short_name == 'TESTR'
-    assert resources[1].common_name == 'Test Resource'
-    assert resources[1].full_name is None
-    assert type(resources[1].url) is gbc.URL
-    assert resources[1].url.id == 234
-    assert resources[1].url.url == 'www.testr.co.uk'
+    assert [r.id for r in resources] == [123, 234]
+    assert queries and all('WHERE' in q for q in queries)
 
-def test_fetch_all_online_resources():
+def test_fetch_all_online_resources(db_conn):
     resources = gbc.fetch_all_online_resources(expanded=False, conn=db_conn)
 
     assert type(resources) is list
     assert len(resources) == 1
 
-    assert resources[0].id == 234
-    assert resources[0].short_name == 'TESTR'
-    assert resources[0].is_online() is True
+    assert (resources[0].id, resources[0].short_name, resources[0].is_online()) == (234, 'TESTR', True)
 
-    assert type(resources[0].url) is gbc.URL
-    assert resources[0].url.id == 234
-    assert resources[0].url.url == 'www.testr.co.uk'
-    assert resources[0].url.is_online() is True
+    assert isinstance(resources[0].url, gbc.URL)
+    assert (resources[0].url.id, resources[0].url.url, resources[0].url.is_online()) == (234, 'www.testr.co.uk', True)
 
 # Test cases for fetching **Versions** from the GBC database
-def test_version_fetch_by_id():
-    version = gbc.fetch_version({'id':1}, conn=db_conn)
+def test_version_fetch_by_id(db_conn):
+    version = gbc.fetch_one_version({'id':1}, conn=db_conn)
 
-    assert type(version) is gbc.Version
-    assert version.id == 1
-    assert version.name == 'v1.1.1'
-    assert version.user == 'carlac'
-    assert version.date == date(2025, 10, 17)
+    assert isinstance(version, gbc.Version)
+    assert _snap(version, version_fields) == version_1
 
-def test_fetch_version_by_id_from_version_obj():
+def test_fetch_version_by_id_from_version_obj(db_conn):
     version = gbc.Version.fetch_by_id(1, conn=db_conn)
 
-    assert type(version) is gbc.Version
-    assert version.id == 1
-    assert version.name == 'v1.1.1'
-    assert version.user == 'carlac'
-    assert version.date == date(2025, 10, 17)
-
-def test_fetch_version_by_user():
+    assert isinstance(version, gbc.Version)
+    assert _snap(version, version_fields) == version_1
+
+def test_fetch_version_not_cached_by_default(db_conn):
+    version1 = gbc.fetch_one_version({'id':1}, conn=db_conn)
+    version2 = gbc.fetch_one_version({'id':1}, conn=db_conn)
+    assert version1 is not version2
+
+def test_fetch_version_inside_fetch_cache(db_conn, count_queries):
+    # repeated id lookups inside the block share objects, also when the id is given as a string
+    with gbc.fetch_cache(db_conn):
+        version1 = gbc.fetch_one_version({'id':1}, conn=db_conn)
+        with count_queries(db_conn) as queries:
+            version2 = gbc.fetch_one_version({'id':'1'}, conn=db_conn)
+            versions = gbc.fetch_version({'id':[1, 2]}, conn=db_conn)
+        assert version2 is version1
+        assert versions[0] is version1
+        assert versions[1].id == 2
+        assert len(queries) == 1
+
+    assert gbc.fetch_one_version({'id':1}, conn=db_conn) is not version1
+
+def test_fetch_cache_cleared_on_commit(db_conn):
+    with gbc.fetch_cache(db_conn):
+        version1 = gbc.fetch_one_version({'id':1}, conn=db_conn)
+        db_conn.commit()
+        assert gbc.fetch_one_version({'id':1}, conn=db_conn) is not version1
+
+def test_fetch_version_by_user(db_conn):
     version = gbc.fetch_version({'user':'carlac'}, conn=db_conn)
 
     assert type(version) is list
     assert len(version) == 2
 
-    assert type(version[0]) is gbc.Version
-    assert version[0].id == 1
-    assert version[0].name == 'v1.1.1'
-    assert version[0].user == 'carlac'
-    assert version[0].date == date(2025, 10, 17)
+    assert all(isinstance(v, gbc.Version) for v in version)
+    assert [_snap(v, version_fields) for v in version] == [version_1, version_2]
 
-    assert type(version[1]) is gbc.Version
-    assert version[1].id == 2
-    assert version[1].name == 'v1.1.2'
-    assert version[1].user == 'carlac'
-    assert version[1].date == date(2025, 10, 17)
+def test_fetch_one_version_with_multiple_matches(db_conn):
+    with pytest.raises(ValueError):
+        gbc.fetch_one_version({'user':'carlac'}, conn=db_conn)
 
-def test_fetch_all_versions():
-    versions = gbc.fetch_all_versions(conn=db_conn)
+def test_fetch_all_versions(all_data):
+    versions = all_data['versions']
 
     assert type(versions) is list
     assert len(versions) == 3
 
-    assert type(versions[0]) is gbc.Version
-    assert versions[0].id == 1
-    assert versions[0].name == 'v1.1.1'
-    assert versions[0].user == 'carlac'
-    assert versions[0].date == date(2025, 10, 17)
-
-    assert type(versions[1]) is gbc.Version
-    assert versions[1].id == 2
-    assert versions[1].name == 'v1.1.2'
-    assert versions[1].user == 'carlac'
-    assert versions[1].date == date(2025, 10, 17)
-
-    assert type(versions[2]) is gbc.Version
-    assert versions[2].id == 3
-    assert versions[2].name == 'v1.1.3'
-    assert versions[2].user == 'nobody'
-    assert versions[2].date == date(2025, 1, 1)
+    assert all(isinstance(v, gbc.Version) for v in versions)
+    assert [_snap(v, version_fields) for v in versions] == [version_1, version_2, version_3]
 
 # Test cases for fetching **URLs and Connection Statuses** from the GBC database
-def test_fetch_url_by_id():
-    url = gbc.fetch_url({'id':234}, conn=db_conn)
+def test_fetch_url_by_id(db_conn):
+    url = gbc.fetch_one_url({'id':234}, conn=db_conn)
 
-    assert type(url) is gbc.URL
-    assert url.id == 234
-    assert url.url == 'www.testr.co.uk'
+    assert isinstance(url, gbc.URL)
+    assert (url.id, url.url) == (234, 'www.testr.co.uk')
 
     assert type(url.status) is list
-    assert type(url.status[0]) is gbc.ConnectionStatus
-    assert url.status[0].status == '200'
-    assert url.status[0].is_online == 1
-    assert url.status[0].is_latest == 1
-
-    assert type(url.status[1]) is gbc.ConnectionStatus
-    assert url.status[1].status == '300'
-    assert url.status[1].is_online == 1
-    assert url.status[1].is_latest == 0
-
-    assert url.status[2].status == '404'
-    assert url.status[2].is_online == 0
-    assert url.status[2].is_latest == 0
+    assert all(isinstance(s, gbc.ConnectionStatus) for s in url.status)
+    assert [_snap(s, ['status', 'is_online', 'is_latest']) for s in url.status] == [
+        {'status': '200', 'is_online': 1, 'is_latest': 1},
+        {'status': '300', 'is_online': 1, 'is_latest': 0},
+        {'status': '404', 'is_online': 0, 'is_latest': 0},
+    ]
 
-def test_fetch_all_urls():
-    urls = gbc.fetch_all_urls(conn=db_conn)
+def test_fetch_all_urls(all_data):
+    urls = all_data['urls']
 
     assert type(urls) is list
     assert len(urls) == 2
 
-    assert type(urls[0]) is gbc.URL
-    assert urls[0].id == 123
-    assert urls[0].url == 'www.test-resource.org'
-    assert type(urls[0].status) is list
-    assert len(urls[0].status) == 1
-    assert urls[0].is_online() is False
-    assert urls[0].latest_connection_status().status == '404'
-    assert urls[0].latest_connection_status().date == datetime(2022, 7, 12, 0, 0, 0)
-
-    assert type(urls[1]) is gbc.URL
-    assert urls[1].id == 234
-    assert urls[1].url == 'www.testr.co.uk'
-    assert type(urls[1].status) is list
-    assert len(urls[1].status) == 3
-    assert urls[1].is_online() is True
-    assert urls[1].latest_connection_status().status == '200'
-    assert urls[1].latest_connection_status().date == datetime(2025, 7, 12, 0, 0, 0)
+    assert all(isinstance(u, gbc.URL) and type(u.status) is list for u in urls)
+    assert [(u.id, u.url, len(u.status), u.is_online()) for u in urls] == [
+        (123, 'www.test-resource.org', 1, False),
+        (234, 'www.testr.co.uk', 3, True),
+    ]
+    assert [(u.latest_connection_status().status, u.latest_connection_status().date) for u in urls] == [
+        ('404', datetime(2022, 7, 12, 0, 0, 0)),
+        ('200', datetime(2025, 7, 12, 0, 0, 0)),
+    ]
 
 # Test cases for fetching **Version** from the GBC database
-def test_fetch_version_by_name():
-    version = gbc.fetch_version({'name':'v1.1.2'}, conn=db_conn)
+def test_fetch_version_by_name(db_conn):
+    version = gbc.fetch_one_version({'name':'v1.1.2'}, conn=db_conn)
 
-    assert type(version) is gbc.Version
-    assert version.id == 2
-    assert version.name == 'v1.1.2'
-    assert version.user == 'carlac'
-    assert version.date == date(2025, 10, 17)
+    assert isinstance(version, gbc.Version)
+    assert _snap(version, version_fields) == version_2
 
 # Test cases for fetching **Publication** from the GBC database
-def test_fetch_publication_by_id():
-    publication = gbc.fetch_publication({'id': 321}, expanded=False, conn=db_conn)
-
-    assert type(publication) is gbc.Publication
-    assert publication.id == 321
-    assert publication.title == 'Publication about test resource'
-    assert publication.authors == 'A. Guy, C. Lady'
-    assert publication.publication_date == date(2025, 1, 10)
-    assert publication.affiliation == 'One place; Another place'
-    assert publication.affiliation_countries == 'Here; There'
-    assert publication.citation_count == 123
-
-    assert publication.grants is None  # not expanded
-
-def test_fetch_publication_expanded_by_id():
-    publication = gbc.fetch_publication({'id': 321}, expanded=True, conn=db_conn)
-
-    assert type(publication) is gbc.Publication
-    assert publication.id == 321
-    assert publication.title == 'Publication about test resource'
-    assert publication.authors == 'A. Guy, C. Lady'
-    assert publication.publication_date == date(2025, 1, 10)
-    assert publication.affiliation == 'One place; Another place'
-    assert publication.affiliation_countries == 'Here; There'
-    assert publication.citation_count == 123
+def _assert_publication_321(publication, expanded):
+    assert isinstance(publication, gbc.Publication)
+    assert _snap(publication, ['id', *publication_fields]) == {'id': 321, **publication_321}
+
+    if not expanded:
+        assert [g.id for g in publication.grants] == [234] # not expanded: loaded on first access
+        return
 
     assert type(publication.grants) is list
     assert len(publication.grants) == 1
-    assert type(publication.grants[0]) is gbc.Grant
-    assert publication.grants[0].id == 234
-    assert publication.grants[0].ext_grant_id == 'DEF-234-Y'
-    assert type(publication.grants[0].grant_agency) is gbc.GrantAgency
-    assert publication.grants[0].grant_agency.id == 567
-    assert publication.grants[0].grant_agency.name == 'Funder no. 2'
-    assert publication.grants[0].grant_agency.country == 'There'
-
-def test_fetch_publication_by_pubmed_id():
-    publication = gbc.fetch_publication({'pubmed_id': 432234}, expanded=True, conn=db_conn)
-
-    assert type(publication) is gbc.Publication
-    assert publication.id == 432
-    assert publication.title == 'Another publication about stuff'
-    assert publication.authors == 'R. Bee'
-    assert publication.publication_date == date(2022, 7, 1)
-    assert publication.affiliation == 'Heartsville'
-    assert publication.affiliation_countries == 'Everywhere'
-    assert publication.citation_count == 3
+    _assert_grant(publication.grants[0], grant_234, grant_agency_567)
+
+@pytest.mark.parametrize('lookup,expanded', [
+    ({'id': 321}, False),
+    ({'id': 321}, True),
+    ({'pubmed_id': 321123}, True),
+    ({'pmc_id': 'PMC321123'}, True),
+])
+def test_fetch_publication(db_conn, lookup, expanded):
+    publication = gbc.fetch_one_publication(lookup, expanded=expanded, conn=db_conn)
+    _assert_publication_321(publication, expanded)
+
+def test_fetch_publication_by_pubmed_id(db_conn):
+    publication = gbc.fetch_one_publication({'pubmed_id': 432234}, expanded=True, conn=db_conn)
+
+    assert isinstance(publication, gbc.Publication)
+    assert _snap(publication, ['id', *publication_fields]) == {'id': 432, **publication_432}
 
     assert type(publication.grants) is list
     assert len(publication.grants) == 1
-    assert type(publication.grants[0]) is gbc.Grant
-    assert publication.grants[0].id == 123
-    assert publication.grants[0].ext_grant_id == 'ABC-123-Z'
-    assert type(publication.grants[0].grant_agency) is gbc.GrantAgency
-    assert publication.grants[0].grant_agency.id == 456
-    assert publication.grants[0].grant_agency.name == 'Funder no. 1'
-    assert publication.grants[0].grant_agency.country == 'Here'
-
-def test_fetch_pub_by_id_from_publication_obj():
+    _assert_grant(publication.grants[0], grant_123, grant_agency_456)
+
+def test_fetch_pub_by_id_from_publication_obj(db_conn):
     # test here can be a bit more minimal as fetch by id is already tested above
     publication = gbc.Publication.fetch_by_id(321, conn=db_conn)
 
-    assert type(publication) is gbc.Publication
-    assert publication.id == 321
-    assert publication.title == 'Publication about test resource'
-    assert publication.authors == 'A. Guy, C. Lady'
+    assert isinstance(publication, gbc.Publication)
+    assert (publication.id, publication.title, publication.authors) == (321, 'Publication about test resource', 'A. Guy, C. Lady')
 
-def test_fetch_pub_by_pubmed_id_from_publication_obj():
+def test_fetch_pub_by_pubmed_id_from_publication_obj(db_conn):
     # test here can be a bit more minimal as fetch by pubmed id is already tested above
     publication = gbc.Publication.fetch_by_pubmed_id(432234, conn=db_conn)
 
-    assert type(publication) is gbc.Publication
-    assert publication.id == 432
-    assert publication.title == 'Another publication about stuff'
-    assert publication.authors == 'R. Bee'
+    assert isinstance(publication, gbc.Publication)
+    assert (publication.id, publication.title, publication.authors) == (432, 'Another publication about stuff', 'R. Bee')
 
-def test_fetch_pub_by_pmc_id_from_publication_obj():
+def test_fetch_pub_by_pmc_id_from_publication_obj(db_conn):
     # test here can be a bit more minimal as fetch by pmc id is already tested above
     publication = gbc.Publication.fetch_by_pmc_id('PMC321123', conn=db_conn)
 
-    assert type(publication) is gbc.Publication
-    assert publication.id == 321
-    assert publication.title == 'Publication about test resource'
-    assert publication.authors == 'A. Guy, C. Lady'
+    assert isinstance(publication, gbc.Publication)
+    assert (publication.id, publication.title, publication.authors) == (321, 'Publication about test resource', 'A. Guy, C. Lady')
 
-def test_fetch_all_publications():
-    publications = gbc.fetch_all_publications(expanded=False, conn=db_conn)
+def test_fetch_all_publications(all_data):
+    publications = all_data['publications']
 
     assert type(publications) is list
     assert len(publications) == 4
 
-    assert type(publications[0]) is gbc.Publication
-    assert publications[0].id == 321
-    assert publications[0].title == 'Publication about test resource'
-    assert publications[0].authors == 'A. Guy, C. Lady'
-    assert publications[0].publication_date == date(2025, 1, 10)
-    assert publications[0].affiliation == 'One place; Another place'
-    assert publications[0].affiliation_countries == 'Here; There'
-    assert publications[0].citation_count == 123
-    assert publications[0].grants is None  # not expanded
-
-    assert type(publications[1]) is gbc.Publication
-    assert publications[1].id == 432
-    assert publications[1].title == 'Another publication about stuff'
-    assert publications[1].authors == 'R. Bee'
-    assert publications[1].publication_date == date(2022, 7, 1)
-    assert publications[1].affiliation == 'Heartsville'
-    assert publications[1].affiliation_countries == 'Everywhere'
-    assert publications[1].citation_count == 3
-    assert publications[1].grants is None  # not expanded
-
-    assert type(publications[2]) is gbc.Publication
-    assert publications[2].id == 789
-    assert publications[2].title == 'I mention accessions'
-    assert publications[2].authors == 'Thing 1, Thing 2'
-    assert publications[2].publication_date == date(2025, 1, 10)
-    assert publications[2].affiliation == 'Whosville'
-    assert publications[2].affiliation_countries == 'Placeyland'
-
-    assert type(publications[3]) is gbc.Publication
-    assert publications[3].id == 890
-    assert publications[3].title == 'I have resource mentions'
-    assert publications[3].pubmed_id == 890098
-    assert publications[3].pmc_id == 'PMC890098'
-
-
-def test_fetch_publication_by_pmc_id():
-    publication = gbc.fetch_publication({'pmc_id': 'PMC321123'}, expanded=True, conn=db_conn)
-
-    assert type(publication) is gbc.Publication
-    assert publication.id == 321
-    assert publication.title == 'Publication about test resource'
-    assert publication.authors == 'A. Guy, C. Lady'
-    assert publication.publication_date == date(2025, 1, 10)
-    assert publication.affiliation == 'One place; Another place'
-    assert publication.affiliation_countries == 'Here; There'
-    assert publication.citation_count == 123
+    assert all(isinstance(p, gbc.Publication) for p in publications)
+    assert _snap(publications[0], ['id', *publication_fields]) == {'id': 321, **publication_321}
+    assert [g.id for g in publications[0].grants] == [234] # not expanded: loaded on first access
+
+    assert _snap(publications[1], ['id', *publication_fields]) == {'id': 432, **publication_432}
+    assert [g.id for g in publications[1].grants] == [123] # not expanded: loaded on first access
+
+    assert _snap(publications[2], ['id', 'title', 'authors', 'publication_date', 'affiliation', 'affiliation_countries']) == {
+        'id': 789, 'title': 'I mention accessions', 'authors': 'Thing 1, Thing 2', 'publication_date': date(2025, 1, 10),
+        'affiliation': 'Whosville', 'affiliation_countries': 'Placeyland',
+    }
+    assert _snap(publications[3], ['id', 'title', 'pubmed_id', 'pmc_id']) == {
+        'id': 890, 'title': 'I have resource mentions', 'pubmed_id': 890098, 'pmc_id': 'PMC890098'
+    }
+
+
+def test_repeated_fetch_reuses_compiled_statements(db_conn):
+    # tables are reflected once per engine, so identical queries hit the compiled-statement cache
+    gbc.fetch_all_resources(expanded=True, conn=db_conn)
+    cache_size = len(db_conn.engine._compiled_cache)
+
+    gbc.fetch_all_resources(expanded=True, conn=db_conn)
+    assert len(db_conn.engine._compiled_cache) == cache_size
+
+# query budgets: expanded fetches load each relationship level in one query, however many rows match.
+# the fetch_all_* main query runs on the raw cursor path, which count_queries records as well
+@pytest.mark.parametrize('fetch,budget', [
+    (lambda conn: gbc.fetch_one_resource({'id':123}, expanded=True, conn=conn), 6),
+    (lambda conn: gbc.fetch_one_publication({'id':321}, expanded=True, conn=conn), 3),
+    (lambda conn: gbc.fetch_all_resources(expanded=True, conn=conn), 6),
+    (lambda conn: gbc.fetch_all_publications(expanded=True, conn=conn), 3),
+], ids=['resource_expanded', 'publication_expanded', 'all_resources_expanded', 'all_publications_expanded'])
+def test_expanded_fetch_query_budget(db_conn, count_queries, fetch, budget):
+    fetch(db_conn) # reflect the tables involved first, so only the fetch queries are counted
+    with count_queries(db_conn) as queries:
+        fetch(db_conn)
+    assert len(queries) == budget
+
+@pytest.mark.parametrize('table', ['resource', 'publication', 'connection_status'])
+def test_select_raw_matches_processed(db_conn, table):
+    # the raw cursor path used by fetch_all_* returns the same values as a regular select
+    assert gbc.select_from_table(table, order_by='id', raw=True, conn=db_conn) == gbc.select_from_table(table, order_by='id', conn=db_conn)
+
+def test_fetch_publication_by_long_id_list(db_conn):
+    # long id lists are passed as a single JSON parameter rather than one bind per id
+    publications = gbc.fetch_publication({'id': [321, 432] + list(range(1000, 1100))}, expanded=False, conn=db_conn)
+
+    assert type(publications) is list
+    assert [p.id for p in publications] == [321, 432]
+
+def test_iter_all_publications(db_conn):
+    # streamed in batches smaller than the table, yielding the same publications as fetch_all_publications
+    publications = list(gbc.iter_all_publications(expanded=True, batch_size=3, conn=db_conn))
+
+def test_iter_all_publications_streams_on_own_connection(db_conn, count_queries):
+    # with expanded=True the grant queries run on the caller's connection, so the stream must not
+    gbc.fetch_all_publications(expanded=True, conn=db_conn) # reflect the tables first
+    with count_queries(db_conn) as queries:
+        publications = list(gbc.iter_all_publications(expanded=True, batch_size=3, conn=db_conn))
+
+    assert [p.id for p in publications] == [321, 432, 789, 890]
+    assert queries and all('WHERE' in q for q in queries)
+
+    assert [p.id for p in publications] == [321, 432, 789, 890]
+    assert [g.id for g in publications[0].grants] == [234]
+    assert publications[2].grants is None
 
-    assert type(publication.grants) is list
-    assert len(publication.grants) == 1
-    assert type(publication.grants[0]) is gbc.Grant
-    assert publication.grants[0].id == 234
-    assert publication.grants[0].ext_grant_id == 'DEF-234-Y'
-    assert type(publication.grants[0].grant_agency) is gbc.GrantAgency
-    assert publication.grants[0].grant_agency.id == 567
-    assert publication.grants[0].grant_agency.name == 'Funder no. 2'
-    assert publication.grants[0].grant_agency.country == 'There'
 
 
 # Test cases for fetching **Grants & Grant Agencies** from the GBC database
-def test_fetch_grant_by_id_list():
+def test_fetch_grant_by_id_list(db_conn):
     grant = gbc.fetch_grant({'id':[123, 234]}, conn=db_conn)
 
     assert type(grant) is list
     assert len(grant) == 2
 
-    assert type(grant[0]) is gbc.Grant
-    assert grant[0].id == 123
-    assert grant[0].ext_grant_id == 'ABC-123-Z'
-
-    assert type(grant[0].grant_agency) is gbc.GrantAgency
-    assert grant[0].grant_agency.id == 456
-    assert grant[0].grant_agency.name == 'Funder no. 1'
-    assert grant[0].grant_agency.country == 'Here'
+    _assert_grant(grant[0], grant_123, grant_agency_456)
+    _assert_grant(grant[1], grant_234, grant_agency_567)
 
-    assert type(grant[1]) is gbc.Grant
-    assert grant[1].id == 234
-    assert grant[1].ext_grant_id == 'DEF-234-Y'
-
-    assert type(grant[1].grant_agency) is gbc.GrantAgency
-    assert grant[1].grant_agency.id == 567
-    assert grant[1].grant_agency.name == 'Funder no. 2'
-    assert grant[1].grant_agency.country == 'There'
-
-def test_fetch_grant_by_ext_id_from_grant_obj():
+def test_fetch_grant_by_ext_id_from_grant_obj(db_conn):
     # test here can be a bit more minimal as fetch is already tested above
     grant = gbc.Grant.fetch_by_ext_id('ABC-123-Z', conn=db_conn)
 
-    assert type(grant) is gbc.Grant
-    assert grant.id == 123
-    assert grant.ext_grant_id == 'ABC-123-Z'
-
-    assert type(grant.grant_agency) is gbc.GrantAgency
-    assert grant.grant_agency.id == 456
-    assert grant.grant_agency.name == 'Funder no. 1'
-    assert grant.grant_agency.country == 'Here'
+    _assert_grant(grant, grant_123, grant_agency_456)
 
-def test_fetch_grant_agency_by_name():
-    grant_agency = gbc.fetch_grant_agency({'name':'Funder no. 1'}, conn=db_conn)
+def test_fetch_grant_agency_by_name(db_conn):
+    grant_agency = gbc.fetch_one_grant_agency({'name':'Funder no. 1'}, conn=db_conn)
 
-    assert type(grant_agency) is gbc.GrantAgency
-    assert grant_agency.id == 456
-    assert grant_agency.name == 'Funder no. 1'
-    assert grant_agency.country == 'Here'
+    assert isinstance(grant_agency, gbc.GrantAgency)
+    assert _snap(grant_agency, grant_agency_fields) == grant_agency_456
 
 
-def test_fetch_all_grant_agencies():
-    grant_agencies = gbc.fetch_all_grant_agencies(conn=db_conn)
+def test_fetch_all_grant_agencies(all_data):
+    grant_agencies = all_data['grant_agencies']
 
     assert type(grant_agencies) is list
     assert len(grant_agencies) == 3
 
-    assert type(grant_agencies[0]) is gbc.GrantAgency
-    assert grant_agencies[0].id == 123
-    assert grant_agencies[0].name == 'Extra name'
-
-    assert type(grant_agencies[1]) is gbc.GrantAgency
-    assert grant_agencies[1].id == 456
-    assert grant_agencies[1].name == 'Funder no. 1'
-    assert grant_agencies[1].country == 'Here'
-
-    assert type(grant_agencies[2]) is gbc.GrantAgency
-    assert grant_agencies[2].id == 567
-    assert grant_agencies[2].name == 'Funder no. 2'
-    assert grant_agencies[2].country == 'There'
+    assert all(isinstance(ga, gbc.GrantAgency) for ga in grant_agencies)
+    assert _snap(grant_agencies[0], ['id', 'name']) == {'id': 123, 'name': 'Extra name'}
+    assert [_snap(ga, grant_agency_fields) for ga in grant_agencies[1:]] == [grant_agency_456, grant_agency_567]
 
@@ -1,200 +1,154 @@
 import globalbiodata as gbc
-import json
+from gbcutils.europepmc import _json_loads # orjson when installed, stdlib json otherwise
+from pathlib import Path
 from datetime import datetime, date
 import pytest
+from unittest import mock
 
 #-------------------------------------#
 # Test GBC classes                    #
 #-------------------------------------#
 
 
-# Tests for URL and ConnectionStatus classes
-def test_URL_no_status():
-    given = {
-        'url': 'www.test.org',
-        'url_country': 'Testland',
-        'url_coordinates': (12.34, 56.78),
-        'wayback_url': None
-    }
+def _shape(obj, spec):
+    # pull the attributes named in `spec` out of `obj` (recursing into nested specs and lists)
+    # so that a whole object graph can be checked with a single `==` and a single pytest diff
+    if isinstance(spec, dict) and not isinstance(obj, dict):
+        return {k: _shape(getattr(obj, k), v) for k, v in spec.items()}
+    if isinstance(spec, list) and isinstance(obj, list):
+        return [_shape(o, sp) for o, sp in zip(obj, spec)] + obj[len(spec):]
+    return obj
 
-    expected = {
-        'url': 'www.test.org',
-        'url_country': 'Testland',
-        'url_coordinates': (12.34, 56.78),
-        'wayback_url': None
-    }
-
-    result = gbc.URL(given)
-    assert result.id is None
-    assert result.url == expected['url']
-    assert result.url_country == expected['url_country']
-    assert result.url_coordinates == expected['url_coordinates']
-    assert result.wayback_url == expected['wayback_url']
-    assert result.status == []
-
-def test_URL_with_str_status():
-    given = {
-        'id': 123,
-        'url': 'www.test.org',
-        'url_status': '200',
-        'connection_date': '2024-07-12 00:00:00'
-    }
+publication_spec = {'title': 'Test Title', 'authors': 'Doe, J.; Smith, A.', 'pubmed_id': '987654321'}
+version_spec = {'name': 'test version', 'date': date(2024, 7, 12), 'user': 'tester'}
 
-    result = gbc.URL(given)
-    print(result.status)
-    assert result.id == 123
-    assert result.url == 'www.test.org'
-    assert type(result.status) is list
-    assert len(result.status) == 1
-
-    this_status = result.status[0]
-    assert type(this_status) is gbc.ConnectionStatus
-    assert this_status.status == '200'
-    assert this_status.date == datetime(2024, 7, 12, 0, 0, 0)
-    assert this_status.url_id == 123
-
-def test_URL_with_obj_status():
-    given = {
-        'id': 123,
-        'url': 'www.test.org',
-        'status': gbc.ConnectionStatus({'url_id':123, 'status':'200', 'date':'2024-07-12 00:00:00'})
+# Flattened resource/publication/version fields shared by the Accession and ResourceMention tests
+@pytest.fixture(scope='module')
+def linked_fields():
+    return {
+        'resource_short_name': 'TestResource',
+        'resource_url': 'www.test.org',
+        'resource_is_gcbr': True,
+        'publication_title': 'Test Title',
+        'publication_authors': 'Doe, J.; Smith, A.',
+        'publication_pubmed_id': '987654321',
+        'version_name': 'test version',
+        'version_date': '2024-07-12',
+        'version_user': 'tester',
+        'version_additional_metadata': {'key3': 'value3', 'key4': 4}
     }
 
-    result = gbc.URL(given)
-    print(result.status)
-    assert result.id == 123
-    assert result.url == 'www.test.org'
-    assert type(result.status) is list
-    assert len(result.status) == 1
-
-    this_status = result.status[0]
-    assert type(this_status) is gbc.ConnectionStatus
-    assert this_status.status == '200'
-    assert this_status.date == datetime(2024, 7, 12, 0, 0, 0)
-    assert this_status.url_id == 123
-
-def test_URL_with_dict_status():
-    given = {
-        'id': 123,
-        'url': 'www.test.org',
-        'status': [
-            {'url_id':123, 'status':'200', 'date':'2024-07-12 00:00:00'},
-            {'url_id':123, 'status':'404', 'date':'2024-07-11 00:00:00'}
-        ]
+@pytest.fixture(scope='module')
+def base_publication_dict():
+    return {
+        'title': 'Test Title',
+        'authors': 'Doe, J.; Smith, A.',
+        'pubmed_id': '987654321',
     }
 
-    result = gbc.URL(given)
-    print(result.status)
-    assert result.id == 123
-    assert result.url == 'www.test.org'
-    assert type(result.status) is list
-    assert len(result.status) == 2
-
-    status1 = result.status[0]
-    assert type(status1) is gbc.ConnectionStatus
-    assert status1.status == '200'
-    assert status1.date == datetime(2024, 7, 12, 0, 0, 0)
-
-    status2 = result.status[1]
-    assert type(status2) is gbc.ConnectionStatus
-    assert status2.status == '404'
-    assert status2.date == datetime(2024, 7, 11, 0, 0, 0)
-    assert status2.url_id == 123
-
-# Tests for Version class
-def test_Version():
-    given = {
+@pytest.fixture(scope='module')
+def base_version_dict():
+    return {
         'version_name': 'test version',
         'date': '2024-07-12',
         'version_user': 'tester',
         'additional_metadata': {'key1': 'value1', 'key2': 2}
     }
 
-    result = gbc.Version(given)
-    assert result.name == 'test version'
-    assert result.date == date(2024, 7, 12)
-    assert result.user == 'tester'
+# Tests for URL and ConnectionStatus classes
+@pytest.mark.parametrize('given,expected,expected_statuses', [
+    (
+        {'url': 'www.test.org', 'url_country': 'Testland', 'url_coordinates': (12.34, 56.78), 'wayback_url': None},
+        {'id': None, 'url': 'www.test.org', 'url_country': 'Testland', 'url_coordinates': (12.34, 56.78), 'wayback_url': None},
+        [],
+    ),
+    (
+        {'id': 123, 'url': 'www.test.org', 'url_status': '200', 'connection_date': '2024-07-12 00:00:00'},
+        {'id': 123, 'url': 'www.test.org'},
+        [('200', datetime(2024, 7, 12, 0, 0, 0), 123)],
+    ),
+    (
+        {'id': 123, 'url': 'www.test.org', 'status': gbc.ConnectionStatus({'url_id':123, 'status':'200', 'date':'2024-07-12 00:00:00'})},
+        {'id': 123, 'url': 'www.test.org'},
+        [('200', datetime(2024, 7, 12, 0, 0, 0), 123)],
+    ),
+    (
+        {'id': 123, 'url': 'www.test.org', 'status': [
+            {'url_id':123, 'status':'200', 'date':'2024-07-12 00:00:00'},
+            {'url_id':123, 'status':'404', 'date':'2024-07-11 00:00:00'}
+        ]},
+        {'id': 123, 'url': 'www.test.org'},
+        [('200', datetime(2024, 7, 12, 0, 0, 0), 123), ('404', datetime(2024, 7, 11, 0, 0, 0), 123)],
+    ),
+], ids=['no_status', 'str_status', 'obj_status', 'dict_status'])
+def test_URL(given, expected, expected_statuses):
+    result = gbc.URL(given)
+    assert {k: getattr(result, k) for k in expected} == expected
+
+    assert isinstance(result.status, list)
+    assert all(isinstance(s, gbc.ConnectionStatus) for s in result.status)
+    assert [(s.status, s.date, s.url_id) for s in result.status] == expected_statuses
+
+# Tests for Version class
+def test_Version(base_version_dict):
+    result = gbc.Version({**base_version_dict})
+    assert (result.name, result.date, result.user) == ('test version', date(2024, 7, 12), 'tester')
     assert result.additional_metadata == {'key1': 'value1', 'key2': 2}
 
 # Tests for Resource class
-def test_Resource_minimal():
-    given = {
-        'short_name': 'TestResource',
-        'common_name': 'Test Resource',
-        'prediction_metadata': 'Some metadata',
-        'is_gcbr': True,
-        'is_latest': False
-    }
-
-    result = gbc.Resource(given)
-    assert result.short_name == 'TestResource'
-    assert result.common_name == 'Test Resource'
-    assert result.prediction_metadata == 'Some metadata'
-    assert result.is_gcbr
-    assert not result.is_latest
+given_resource_minimal = {
+    'short_name': 'TestResource',
+    'common_name': 'Test Resource',
+    'prediction_metadata': 'Some metadata',
+    'is_gcbr': True,
+    'is_latest': False
+}
+given_resource_full = {
+    **given_resource_minimal,
+    'url': 'www.test.org',
+    'url_country': 'Testland',
+    'url_coordinates': (12.34, 56.78),
+    'wayback_url': 'www.wayback.org/test',
+    'status': [
+        {'status':'200', 'date':datetime(2024, 7, 12, 0, 0, 0)}
+    ],
+    'version_name': 'test version',
+    'version_date': date(2024, 7, 12),
+    'version_user': 'tester',
+    'ext_grant_ids': 'G12345, G67890',
+    'grant_agencies': 'Test Agency, Another Agency',
+    'title': 'Test Title',
+    'authors': 'Doe, J.; Smith, A.',
+    'pubmed_id': '987654321',
+}
+
+@pytest.mark.parametrize('given', [given_resource_minimal, given_resource_full], ids=['minimal', 'full'])
+def test_Resource(given):
+    result = gbc.Resource(dict(given))
+    assert (result.short_name, result.common_name, result.prediction_metadata) == ('TestResource', 'Test Resource', 'Some metadata')
+    assert (bool(result.is_gcbr), bool(result.is_latest)) == (True, False)
 
 def test_Resource_full():
-    given = {
-        'short_name': 'TestResource',
-        'common_name': 'Test Resource',
-        'prediction_metadata': 'Some metadata',
-        'is_gcbr': True,
-        'is_latest': False,
-        'url': 'www.test.org',
-        'url_country': 'Testland',
-        'url_coordinates': (12.34, 56.78),
-        'wayback_url': 'www.wayback.org/test',
-        'status': [
-            {'status':'200', 'date':datetime(2024, 7, 12, 0, 0, 0)}
+    # links built from the flattened url/version/grant/publication fields
+    result = gbc.Resource(dict(given_resource_full))
+
+    assert isinstance(result.url, gbc.URL) and isinstance(result.version, gbc.Version)
+    assert all(isinstance(st, gbc.ConnectionStatus) for st in result.url.status)
+    assert all(isinstance(g.grant_agency, gbc.GrantAgency) for g in result.grants)
+
+    expected = {
+        'url': {
+            'url': 'www.test.org', 'url_country': 'Testland', 'url_coordinates': (12.34, 56.78), 'wayback_url': 'www.wayback.org/test',
+            'status': [{'status': '200', 'date': datetime(2024, 7, 12, 0, 0, 0)}],
+        },
+        'version': version_spec,
+        'grants': [
+            {'ext_grant_id': 'G12345', 'grant_agency': {'name': 'Test Agency'}},
+            {'ext_grant_id': 'G67890', 'grant_agency': {'name': 'Another Agency'}},
         ],
-        'version_name': 'test version',
-        'version_date': date(2024, 7, 12),
-        'version_user': 'tester',
-        'ext_grant_ids': 'G12345, G67890',
-        'grant_agencies': 'Test Agency, Another Agency',
-        'title': 'Test Title',
-        'authors': 'Doe, J.; Smith, A.',
-        'pubmed_id': '987654321',
+        'publications': [publication_spec],
     }
-
-    result = gbc.Resource(given)
-    assert result.short_name == 'TestResource'
-    assert result.common_name == 'Test Resource'
-    assert result.prediction_metadata == 'Some metadata'
-    assert result.is_gcbr
-    assert not result.is_latest
-
-    assert type(result.url) is gbc.URL
-    assert result.url.url == 'www.test.org'
-    assert result.url.url_country == 'Testland'
-    assert result.url.url_coordinates == (12.34, 56.78)
-    assert result.url.wayback_url == 'www.wayback.org/test'
-    assert type(result.url.status) is list
-    assert len(result.url.status) == 1
-    assert type(result.url.status[0]) is gbc.ConnectionStatus
-    assert result.url.status[0].status == '200'
-    assert result.url.status[0].date == datetime(2024, 7, 12, 0, 0, 0)
-
-    assert type(result.version) is gbc.Version
-    assert result.version.name == 'test version'
-    assert result.version.date == date(2024, 7, 12)
-    assert result.version.user == 'tester'
-
-    assert type(result.grants) is list
-    assert len(result.grants) == 2
-    print(result.grants[0].__dict__)
-    assert result.grants[0].ext_grant_id == 'G12345'
-    assert type(result.grants[0].grant_agency) is gbc.GrantAgency
-    assert result.grants[0].grant_agency.name == 'Test Agency'
-    assert result.grants[1].ext_grant_id == 'G67890'
-    assert type(result.grants[1].grant_agency) is gbc.GrantAgency
-    assert result.grants[1].grant_agency.name == 'Another Agency'
-
-    assert type(result.publications) is list
-    assert len(result.publications) == 1
-    assert result.publications[0].title == 'Test Title'
-    assert result.publications[0].authors == 'Doe, J.; Smith, A.'
-    assert result.publications[0].pubmed_id == '987654321'
+    assert _shape(result, expected) == expected
 
 # Tests for Publication class
 def test_Publication():
@@ -211,170 +165,86 @@ def test_Publication():
     }
 
     result = gbc.Publication(given)
-    assert result.title == 'Test Title'
-    assert result.authors == 'Doe, J.; Smith, A.'
-    assert result.pubmed_id == '987654321'
-    assert result.pmc_id == 'PMC123456'
-    assert result.affiliation == 'Test University; Another Institute'
-    assert result.affiliation_countries == 'Testland; Anotherland'
+    assert (result.title, result.authors, result.pubmed_id, result.pmc_id) == ('Test Title', 'Doe, J.; Smith, A.', '987654321', 'PMC123456')
+    assert (result.affiliation, result.affiliation_countries) == ('Test University; Another Institute', 'Testland; Anotherland')
     assert result.publication_date == date(2024, 6, 30)
 
-    assert type(result.grants) is list
-    assert len(result.grants) == 2
-    print(result.grants[0].__dict__)
-    assert result.grants[0].ext_grant_id == 'G12345'
-    assert type(result.grants[0].grant_agency) is gbc.GrantAgency
-    assert result.grants[0].grant_agency.name == 'Test Agency'
-    assert result.grants[1].ext_grant_id == 'G67890'
-    assert type(result.grants[1].grant_agency) is gbc.GrantAgency
-    assert result.grants[1].grant_agency.name == 'Another Agency'
+    assert isinstance(result.grants, list)
+    assert all(isinstance(g.grant_agency, gbc.GrantAgency) for g in result.grants)
+    assert [(g.ext_grant_id, g.grant_agency.name) for g in result.grants] == [('G12345', 'Test Agency'), ('G67890', 'Another Agency')]
 
 
 # Tests for Accession class
-def test_Accession():
+def test_Accession(linked_fields):
     given = {
+        **linked_fields,
         'accession': 'ABC123',
-        'resource_short_name': 'TestResource',
-        'resource_url': 'www.test.org',
-        'resource_is_gcbr': True,
-        'publication_title': 'Test Title',
-        'publication_authors': 'Doe, J.; Smith, A.',
-        'publication_pubmed_id': '987654321',
-        'version_name': 'test version',
-        'version_date': '2024-07-12',
-        'version_user': 'tester',
         'additional_metadata': {'key1': 'value1', 'key2': 2},
-        'version_additional_metadata': {'key3': 'value3', 'key4': 4}
     }
 
     result = gbc.Accession(given)
-    assert result.accession == 'ABC123'
-    assert type(result.resource) is gbc.Resource
-    assert result.resource.short_name == 'TestResource'
-    assert result.resource.url.url == 'www.test.org'
-    assert result.resource.is_gcbr
-    assert result.additional_metadata == {'key1': 'value1', 'key2': 2}
-
-    assert type(result.publications) is list
-    assert len(result.publications) == 1
-    assert result.publications[0].title == 'Test Title'
-    assert result.publications[0].authors == 'Doe, J.; Smith, A.'
-    assert result.publications[0].pubmed_id == '987654321'
+    assert isinstance(result.resource, gbc.Resource) and isinstance(result.version, gbc.Version)
 
-    assert type(result.version) is gbc.Version
-    print(result.version.__dict__)
-    assert result.version.name == 'test version'
-    assert result.version.date == date(2024, 7, 12)
-    assert result.version.user == 'tester'
-    assert result.version.additional_metadata == {'key3': 'value3', 'key4': 4}
+    expected = {
+        'accession': 'ABC123',
+        'additional_metadata': {'key1': 'value1', 'key2': 2},
+        'resource': {'short_name': 'TestResource', 'url': {'url': 'www.test.org'}, 'is_gcbr': True},
+        'publications': [publication_spec],
+        'version': {**version_spec, 'additional_metadata': {'key3': 'value3', 'key4': 4}},
+    }
+    assert _shape(result, expected) == expected
 
 # Tests for ResourceMention class
-def test_ResourceMention_str():
+def test_ResourceMention_str(linked_fields):
     given = {
-        'resource_short_name': 'TestResource',
-        'resource_url': 'www.test.org',
-        'resource_is_gcbr': True,
-        'publication_title': 'Test Title',
-        'publication_authors': 'Doe, J.; Smith, A.',
-        'publication_pubmed_id': '987654321',
-        'version_name': 'test version',
-        'version_date': '2024-07-12',
-        'version_user': 'tester',
-        'version_additional_metadata': {'key3': 'value3', 'key4': 4},
+        **linked_fields,
         'matched_alias': 'TestResource alias',
         'match_count': 5,
         'mean_confidence': 0.95,
     }
 
     result = gbc.ResourceMention(given)
+    assert isinstance(result.resource, gbc.Resource) and isinstance(result.publication, gbc.Publication) and isinstance(result.version, gbc.Version)
+    assert all(isinstance(a, gbc.MatchedAlias) for a in result.matched_aliases)
 
-    assert type(result.matched_aliases) is list
-    assert type(result.matched_aliases[0]) is gbc.MatchedAlias
-    assert result.matched_aliases[0].matched_alias == 'TestResource alias'
-    assert result.matched_aliases[0].match_count == 5
-    assert result.matched_aliases[0].mean_confidence == 0.95
-    assert result.match_count == 5
-    assert result.mean_confidence == 0.95
-
-    assert type(result.resource) is gbc.Resource
-    assert result.resource.short_name == 'TestResource'
-    assert result.resource.url.url == 'www.test.org'
-    assert result.resource.is_gcbr
-
-    assert type(result.publication) is gbc.Publication
-    assert result.publication.title == 'Test Title'
-    assert result.publication.authors == 'Doe, J.; Smith, A.'
-    assert result.publication.pubmed_id == '987654321'
-
-    assert type(result.version) is gbc.Version
-    print(result.version.__dict__)
-    assert result.version.name == 'test version'
-    assert result.version.date == date(2024, 7, 12)
-    assert result.version.user == 'tester'
-    assert result.version.additional_metadata == {'key3': 'value3', 'key4': 4}
-
-def test_ResourceMention_obj():
-    given_resource = {
-        'short_name': 'TestResource',
-        'common_name': 'Test Resource',
-        'prediction_metadata': 'Some metadata',
-        'is_gcbr': True,
-        'is_latest': False
-    }
-    given_publication = {
-        'title': 'Test Title',
-        'authors': 'Doe, J.; Smith, A.',
-        'pubmed_id': '987654321',
-    }
-    given_version = {
-        'version_name': 'test version',
-        'date': '2024-07-12',
-        'version_user': 'tester',
-        'additional_metadata': {'key1': 'value1', 'key2': 2}
+    expected = {
+        'match_count': 5,
+        'mean_confidence': pytest.approx(0.95),
+        'matched_aliases': [{'matched_alias': 'TestResource alias', 'match_count': 5, 'mean_confidence': pytest.approx(0.95)}],
+        'resource': {'short_name': 'TestResource', 'url': {'url': 'www.test.org'}, 'is_gcbr': True},
+        'publication': publication_spec,
+        'version': {**version_spec, 'additional_metadata': {'key3': 'value3', 'key4': 4}},
     }
+    assert _shape(result, expected) == expected
+
+def test_ResourceMention_obj(base_publication_dict, base_version_dict):
     given_aliases = [
         gbc.MatchedAlias({'matched_alias': 'TestResource alias', 'match_count': 5, 'mean_confidence': 0.95}),
         gbc.MatchedAlias({'matched_alias': 'Another alias', 'match_count': 3, 'mean_confidence': 0.85})
     ]
     given = {
-        'resource': gbc.Resource(given_resource),
-        'publication': gbc.Publication(given_publication),
-        'version': gbc.Version(given_version),
+        'resource': gbc.Resource(dict(given_resource_minimal)),
+        'publication': gbc.Publication({**base_publication_dict}),
+        'version': gbc.Version({**base_version_dict}),
         'matched_aliases': given_aliases,
     }
 
     result = gbc.ResourceMention(given)
-    assert result.match_count == 8
-    assert result.mean_confidence == pytest.approx(0.9)
-
-    assert type(result.matched_aliases) is list
-    assert len(result.matched_aliases) == 2
-    assert type(result.matched_aliases[0]) is gbc.MatchedAlias
-    assert result.matched_aliases[0].matched_alias == 'TestResource alias'
-    assert result.matched_aliases[0].match_count == 5
-    assert result.matched_aliases[0].mean_confidence == 0.95
-    assert type(result.matched_aliases[1]) is gbc.MatchedAlias
-    assert result.matched_aliases[1].matched_alias == 'Another alias'
-    assert result.matched_aliases[1].match_count == 3
-    assert result.matched_aliases[1].mean_confidence == 0.85
-
-
-    assert type(result.resource) is gbc.Resource
-    assert result.resource.short_name == 'TestResource'
-    assert result.resource.common_name == 'Test Resource'
-    assert result.resource.is_gcbr
-
-    assert type(result.publication) is gbc.Publication
-    assert result.publication.title == 'Test Title'
-    assert result.publication.authors == 'Doe, J.; Smith, A.'
-    assert result.publication.pubmed_id == '987654321'
-
-    assert type(result.version) is gbc.Version
-    print(result.version.__dict__)
-    assert result.version.name == 'test version'
-    assert result.version.date == date(2024, 7, 12)
-    assert result.version.user == 'tester'
-    assert result.version.additional_metadata == {'key1': 'value1', 'key2': 2}
+    assert isinstance(result.resource, gbc.Resource) and isinstance(result.publication, gbc.Publication) and isinstance(result.version, gbc.Version)
+    assert all(isinstance(a, gbc.MatchedAlias) for a in result.matched_aliases)
+
+    expected = {
+        'match_count': 8,
+        'mean_confidence': pytest.approx(0.9),
+        'matched_aliases': [
+            {'matched_alias': 'TestResource alias', 'match_count': 5, 'mean_confidence': pytest.approx(0.95)},
+            {'matched_alias': 'Another alias', 'match_count': 3, 'mean_confidence': pytest.approx(0.85)},
+        ],
+        'resource': {'short_name': 'TestResource', 'common_name': 'Test Resource', 'is_gcbr': True},
+        'publication': publication_spec,
+        'version': {**version_spec, 'additional_metadata': {'key1': 'value1', 'key2': 2}},
+    }
+    assert _shape(result, expected) == expected
 
 #-------------------------------------#
 # End of class tests                  #
@@ -385,17 +255,20 @@ def test_ResourceMention_obj():
 # Test GBC helper functions           #
 #-------------------------------------#
 
+extract_given = {'resource_short_name': 'test', 'resource_url': 'www.test.com', 'other_field': 1}
+extract_expected = {'short_name': 'test', 'url': 'www.test.com'}
+
 def test_extract_fields_by_type():
-    given = {'resource_short_name': 'test', 'resource_url': 'www.test.com', 'other_field': 1}
-    expected = {'short_name': 'test', 'url': 'www.test.com'}
+    assert gbc.extract_fields_by_type(extract_given, 'resource') == extract_expected
 
-    result = gbc.extract_fields_by_type(given, 'resource')
-    assert result == expected
 
 
+# Sample EuropePMC result, parsed once per session
+epmc_result_path = Path(__file__).parent / 'test_data' / 'epmc_result.json'
 
-# Load a sample EuropePMC result for testing
-epmc_result = json.load(open('test/test_data/epmc_result.json', 'r'))
+@pytest.fixture(scope='session')
+def epmc_result():
+    return _json_loads(epmc_result_path.read_bytes())
 
 # Mock locationtagger place class for testing
 class FakePlace:
@@ -404,105 +277,83 @@ class FakePlace:
         self.country_regions = regions or {}
         self.country_cities = cities or {}
 
-def test_new_publication_from_EuropePMC_result(monkeypatch):
+def _fake_find_locations(places):
+    # stands in for locationtagger.find_locations: the first key found in the text picks the place
+    def find_locations(text):
+        return next((place for fragment, place in places.items() if fragment in text), FakePlace())
+    return find_locations
+
+# fake locationtagger results, keyed by a fragment of the text passed in
+epmc_places = {
+    "Dublin, Ireland": FakePlace(countries=["Ireland"]),
+    "Denver, United States": FakePlace(countries=["United States"]),
+}
+affiliation_places = {
+    "Some Dept., Dublin2": FakePlace(regions={"Ireland": ["Leinster"]}),
+    "Some Dept., Atlanta": FakePlace(regions={"United States": ["Georgia"]}),
+    "Some Dept., Paris": FakePlace(countries=["France", "Germany"]),
+    "Some Dept., Portland": FakePlace(regions={"United States": ["Oregon"], "Canada": ["Ontario"]}),
+    "Some Dept., Denver": FakePlace(cities={"United States": ["Denver"]}),
+    "Some Dept., Cambridge": FakePlace(cities={"United Kingdom": ["Cambridge"], "United States": ["Cambridge"]}),
+    "University of Oregon": FakePlace(countries=["United States"]),
+    "University of Cambridge": FakePlace(countries=["United Kingdom"]),
+}
+
+# fake Google Maps find_place candidates, keyed by a fragment of the address looked up
+gmaps_candidates = {
+    "Portland": [{"formatted_address": "University of Oregon, Portland, United States"}],
+    "Cambridge": [{"formatted_address": "University of Cambridge, United Kingdom"}],
+}
+
+def test_new_publication_from_EuropePMC_result(epmc_result):
     # Patch the location tagger to return a fixed fake place,
     # without actually calling the external service
-    def fake_find_locations(text):
-        if "Dublin, Ireland" in text:
-            return FakePlace(countries=["Ireland"])
-        elif "Denver, United States" in text:
-            return FakePlace(countries=["United States"])
-        else:
-            return FakePlace()
-
-    monkeypatch.setattr(gbc.utils.locationtagger, "find_locations", fake_find_locations)
-
-    result = gbc.new_publication_from_EuropePMC_result(epmc_result)
-    assert type(result) is gbc.Publication
-    assert result.pubmed_id == '54321'
-    assert result.pmc_id == 'PMC12345'
-    assert result.title == "Very interesting article."
-    assert result.authors == "Hide I, Padgett WL, Jacobson KA, Daly JW."
+    with mock.patch.object(gbc.utils.locationtagger, "find_locations", _fake_find_locations(epmc_places)):
+        result = gbc.new_publication_from_EuropePMC_result(epmc_result)
+    assert isinstance(result, gbc.Publication)
+    assert (result.pubmed_id, result.pmc_id) == ('54321', 'PMC12345')
+    assert (result.title, result.authors) == ("Very interesting article.", "Hide I, Padgett WL, Jacobson KA, Daly JW.")
     assert result.affiliation == "Center for Craic, Dublin, Ireland; Department of Pharmacology, Denver, United States"
     assert result.affiliation_countries == "Ireland; United States"
     assert result.publication_date == date(2022, 2, 1)
     assert result.citation_count == 78
     assert result.keywords == "'Membranes'; 'enzymology'; 'Animals'; 'Phenethylamines'; 'pharmacology'"
 
-    assert type(result.grants) is list
-    assert len(result.grants) == 2
-    assert result.grants[0].ext_grant_id == "Z01 YTHO"
-    assert type(result.grants[0].grant_agency) is gbc.GrantAgency
-    assert result.grants[0].grant_agency.name == "NIH"
-    assert result.grants[1].ext_grant_id == "Z99 MKAY"
-    assert type(result.grants[1].grant_agency) is gbc.GrantAgency
-    assert result.grants[1].grant_agency.name == "EU"
-
-def test_clean_affiliations():
-    # Test that affiliations are cleaned of extra spaces and semicolons
-    given_1 = "  University of Test  ; Trento;; Italy test@email.com "
-    expected_1 = "University of Test, Trento, Italy"
-
-    result_1 = gbc.utils._clean_affiliation(given_1)
-    assert result_1 == expected_1
-
-    # Test postcode removal and country abbreviation expansion
-    given_2 = "Dept. of Biology, University of Test, Test City, UK, AB12 3CD"
-    expected_2 = "Dept. of Biology, University of Test, Test City, United Kingdom"
-
-    result_2 = gbc.utils._clean_affiliation(given_2)
-    assert result_2 == expected_2
-
-def test_find_country(monkeypatch):
-    # Patch the location tagger to return a fixed fake place,
-    # without actually calling the external service
-    def fake_locationtagger_find_locations(text):
-        if "Some Dept., Dublin2" in text:
-            return FakePlace(regions={"Ireland": ["Leinster"]})
-        elif "Some Dept., Portland" in text:
-            return FakePlace(regions={"United States": ["Oregon"], "Canada": ["Ontario"]})
-        elif "Some Dept., Denver" in text:
-            return FakePlace(cities={"United States": ["Denver"]})
-        elif "Some Dept., Cambridge" in text:
-            return FakePlace(cities={"United Kingdom": ["Cambridge"], "United States": ["Cambridge"]})
-        elif "University of Oregon" in text:
-            return FakePlace(countries=["United States"])
-        elif "University of Cambridge" in text:
-            return FakePlace(countries=["United Kingdom"])
-
-    class FakeClient: # for googlemaps.Client monkeypatch
-        def __init__(self, key=None):
-            pass
-        def find_place(self, address, input_type, fields=None):
-            if "Portland" in address:
-                return {"candidates": [{"formatted_address": "University of Oregon, Portland, United States"}]}
-            if "Cambridge" in address:
-                return {"candidates": [{"formatted_address": "University of Cambridge, United Kingdom"}]}
-            return {"candidates": []}
-
-    monkeypatch.setattr(gbc.utils.locationtagger, "find_locations", fake_locationtagger_find_locations)
-    monkeypatch.setattr(gbc.utils.googlemaps, "Client", lambda key=None: FakeClient())
-
-    # Test region-based disambiguation
-    given_1 = "Some Dept., Dublin2, Ireland"
-    expected_1 = (["Ireland"], 'locationtagger')  # Should resolve to Ireland based on region
-    result_1 = gbc.utils._find_country(given_1, google_maps_api_key='fake_key')
-    assert result_1 == expected_1
-
-    # Test Google Maps region fallback
-    given_2 = "Some Dept., Portland, USA"
-    expected_2 = (["United States"], 'GoogleMaps')  # Should resolve to United States based on Google Maps
-    result_2 = gbc.utils._find_country(given_2, google_maps_api_key='fake_key')
-    assert result_2 == expected_2
-
-    # Test city-based disambiguation
-    given_3 = "Some Dept., Denver"
-    expected_3 = (["United States"], 'locationtagger')  # Should resolve to United States based on city
-    result_3 = gbc.utils._find_country(given_3, google_maps_api_key='fake_key')
-    assert result_3 == expected_3
-
-    # Test Google Maps city fallback
-    given_4 = "Some Dept., Cambridge"
-    expected_4 = (["United Kingdom"], 'GoogleMaps')  # Should resolve to United Kingdom based on Google Maps
-    result_4 = gbc.utils._find_country(given_4, google_maps_api_key='fake_key')
-    assert result_4 == expected_4
\ No newline at end of file
+    assert isinstance(result.grants, list)
+    assert all(isinstance(g.grant_agency, gbc.GrantAgency) for g in result.grants)
+    assert [(g.ext_grant_id, g.grant_agency.name) for g in result.grants] == [("Z01 YTHO", "NIH"), ("Z99 MKAY", "EU")]
+
+@pytest.mark.parametrize('given,expected', [
+    # extra spaces, semicolons and email addresses are cleaned out
+    ("  University of Test  ; Trento;; Italy test@email.com ", "University of Test, Trento, Italy"),
+    # postcodes are removed and country abbreviations expanded
+    ("Dept. of Biology, University of Test, Test City, UK, AB12 3CD", "Dept. of Biology, University of Test, Test City, United Kingdom"),
+], ids=['separators', 'postcode'])
+def test_clean_affiliations(given, expected):
+    assert gbc.utils._clean_affiliation(given) == expected
+
+class FakeClient: # stands in for googlemaps.Client
+    def __init__(self, key=None):
+        pass
+    def find_place(self, address, input_type, fields=None):
+        candidates = next((c for fragment, c in gmaps_candidates.items() if fragment in address), [])
+        return {"candidates": candidates}
+
+@pytest.mark.parametrize('given,expected', [
+    ("Some Dept., Dublin2, Ireland", (["Ireland"], 'gazetteer')), # trailing country name: resolved without calling locationtagger
+    ("Some Dept., Lyon, FRANCE.", (["France"], 'gazetteer')), # returned as the canonical pycountry name
+    ("Some Dept., Madrid, Kingdom of Spain", (["Spain"], 'gazetteer')), # official names map to the common name
+    ("Some Dept., Paris, France, Other Dept., Berlin, Germany", (["France", "Germany"], 'locationtagger')), # two countries: no fast path
+    ("Some Dept., Atlanta, Georgia", (["United States"], 'locationtagger')), # country name that is also a region: no fast path
+    ("Some Dept., Portland, USA", (["United States"], 'GoogleMaps')), # ambiguous region: Google Maps fallback
+    ("Some Dept., Denver", (["United States"], 'locationtagger')), # city-based disambiguation
+    ("Some Dept., Cambridge", (["United Kingdom"], 'GoogleMaps')), # ambiguous city: Google Maps fallback
+    ("Some Dept., Dublin2", (["Ireland"], 'locationtagger')), # region-based disambiguation
+], ids=['gazetteer', 'gazetteer_case', 'gazetteer_official', 'two_countries', 'country_as_region', 'gmaps_region', 'city', 'gmaps_city', 'region'])
+def test_find_country(given, expected):
+    # Patch the location tagger and Google Maps client around the call,
+    # without actually calling the external services
+    with mock.patch.object(gbc.utils.locationtagger, "find_locations", _fake_find_locations(affiliation_places)), \
+         mock.patch.object(gbc.utils.googlemaps, "Client", FakeClient):
+        result = gbc.utils._find_country(given, google_maps_api_key='fake_key')
+    assert result == expected
@@ -1,113 +1,171 @@
-from bin.load_inventory import uniq_with_order, explode_record, split_record_data
+import bin.load_inventory as load_inventory
+from bin.load_inventory import uniq_with_order, explode_record, split_record_data, iter_records, iter_pending_records, fetch_loaded_records, write_resources
+from contextlib import nullcontext
+from sqlalchemy.exc import OperationalError
+from unittest import mock
+import pytest
+
+uniq_given = "apple, banana, apple, orange, banana, grape"
+uniq_to_remove = ["banana"]
+uniq_expected = "apple; orange; grape"
 
 def test_uniq_with_order():
-    input_str = "apple, banana, apple, orange, banana, grape"
-    to_remove = ["banana"]
-    expected_output = "apple; orange; grape"
-    assert uniq_with_order(input_str, to_remove) == expected_output
-
-def test_explode_record():
-    record = {
-        'pubmed_id': '1234,5678,0123',
-        'title': 'TestDB: a test database',
-        'short_name': 'TestDB',
-        'url': 'http://testdb.com'
-    }
+    assert uniq_with_order(uniq_given, uniq_to_remove) == uniq_expected
 
-    expected_records = [{
-        'pubmed_id': '1234',
-        'title': 'TestDB: a test database',
-        'short_name': 'TestDB',
-        'url': 'http://testdb.com'
-        }, {
-        'pubmed_id': '5678',
-        'title': 'TestDB: a test database',
-        'short_name': 'TestDB',
-        'url': 'http://testdb.com'
-        }, {
-        'pubmed_id': '0123',
-        'title': 'TestDB: a test database',
-        'short_name': 'TestDB',
-        'url': 'http://testdb.com'
-        }
-    ]
+explode_base = {
+    'title': 'TestDB: a test database',
+    'short_name': 'TestDB',
+    'url': 'http://testdb.com'
+}
 
-    result = explode_record(record)
+@pytest.mark.parametrize('record,expected_records', [
+    ({**explode_base, 'pubmed_id': '1234,5678,0123'}, [
+        {**explode_base, 'pubmed_id': '1234'},
+        {**explode_base, 'pubmed_id': '5678'},
+        {**explode_base, 'pubmed_id': '0123'},
+    ]),
+    ({**explode_base, 'pubmed_id': '1234'}, [{**explode_base, 'pubmed_id': '1234'}]),
+], ids=['multiple_ids', 'single_id'])
+def test_explode_record(record, expected_records):
+    assert explode_record(record) == expected_records
 
-    assert result == expected_records
+record_A = {
+    'pubmed_id': '12345678',
+    'title': 'TestDB: a test database',
+    'authors': 'Doe J, Smith A, Doe J, Smith B',
+    'affiliation_countries': 'Testland, Examplestan, Testland, Testland',
+    'short_name': 'TestDB',
+    'short_name_prob': '0.95',
+    'common_name': 'TestDB Common',
+    'common_name_prob': '0.90',
+    'full_name': 'Test Database Full',
+    'full_name_prob': '0.85',
+    'url': 'http://testdb.com',
+    'url_status': '200',
+}
 
-def test_split_record_data_A():
-    record_A = {
-        'pubmed_id': '12345678',
-        'title': 'TestDB: a test database',
-        'authors': 'Doe J, Smith A, Doe J, Smith B',
-        'affiliation_countries': 'Testland, Examplestan, Testland, Testland',
-        'short_name': 'TestDB',
+expected_A = {
+    'pubmed_id': '12345678',
+    'title': 'TestDB: a test database',
+    'authors': 'Doe J; Smith A; Smith B',
+    'affiliation_countries': 'Testland; Examplestan',
+    'url': 'http://testdb.com',
+    'online': True,
+    'url_status': '200',
+    'short_name': 'TestDB',
+    'common_name': 'TestDB Common',
+    'full_name': 'Test Database Full',
+    'resource_prediction_metadata': {
         'short_name_prob': '0.95',
-        'common_name': 'TestDB Common',
         'common_name_prob': '0.90',
-        'full_name': 'Test Database Full',
-        'full_name_prob': '0.85',
-        'url': 'http://testdb.com',
-        'url_status': '200',
-    }
-
-    expected_A = {
-        'pubmed_id': '12345678',
-        'title': 'TestDB: a test database',
-        'authors': 'Doe J; Smith A; Smith B',
-        'affiliation_countries': 'Testland; Examplestan',
-        'url': 'http://testdb.com',
-        'online': True,
-        'url_status': '200',
-        'short_name': 'TestDB',
-        'common_name': 'TestDB Common',
-        'full_name': 'Test Database Full',
-        'resource_prediction_metadata': {
-            'short_name_prob': '0.95',
-            'common_name_prob': '0.90',
-            'full_name_prob': '0.85'
-        }
+        'full_name_prob': '0.85'
     }
+}
 
-    result_A = split_record_data(record_A)
+# url_status as recorded for a connection that timed out
+timeout_status = "HTTPConnectionPool(host='147.8.74.24', port=80): Max retries exceeded with url: /16SpathDB (Caused by ConnectTimeoutError(<urllib3.connection.HTTPConnection object at 0x7f6f246776d0>, 'Connection to 147.8.74.24 timed out. (connect timeout=5)'))"
 
-    assert result_A == expected_A
+record_B = {
+    'pubmed_id': '87654321',
+    'title': 'Another TestDB: a test database',
+    'authors': 'Doe J, Smith A, Doe J, Smith B',
+    'affiliation_countries': 'Testland, Examplestan, Testland, Testland',
+    'short_name': 'AnTestDB',
+    'short_name_prob': '0.95',
+    'common_name': 'AnTestDB Common',
+    'common_name_prob': '0.90',
+    'full_name': 'AnTest Database Full',
+    'full_name_prob': '0.85',
+    'url': 'http://antestdb.com',
+    'url_status': timeout_status,
+}
 
-def test_split_record_data_B():
-    record_B = {
-        'pubmed_id': '87654321',
-        'title': 'Another TestDB: a test database',
-        'authors': 'Doe J, Smith A, Doe J, Smith B',
-        'affiliation_countries': 'Testland, Examplestan, Testland, Testland',
-        'short_name': 'AnTestDB',
+expected_B = {
+    'pubmed_id': '87654321',
+    'title': 'Another TestDB: a test database',
+    'authors': 'Doe J; Smith A; Smith B',
+    'affiliation_countries': 'Testland; Examplestan',
+    'url': 'http://antestdb.com',
+    'online': False,
+    'url_status': timeout_status,
+    'short_name': 'AnTestDB',
+    'common_name': 'AnTestDB Common',
+    'full_name': 'AnTest Database Full',
+    'resource_prediction_metadata': {
         'short_name_prob': '0.95',
-        'common_name': 'AnTestDB Common',
         'common_name_prob': '0.90',
-        'full_name': 'AnTest Database Full',
-        'full_name_prob': '0.85',
-        'url': 'http://antestdb.com',
-        'url_status': "HTTPConnectionPool(host='147.8.74.24', port=80): Max retries exceeded with url: /16SpathDB (Caused by ConnectTimeoutError(<urllib3.connection.HTTPConnection object at 0x7f6f246776d0>, 'Connection to 147.8.74.24 timed out. (connect timeout=5)'))",
+        'full_name_prob': '0.85'
     }
+}
 
-    expected_B = {
-        'pubmed_id': '87654321',
-        'title': 'Another TestDB: a test database',
-        'authors': 'Doe J; Smith A; Smith B',
-        'affiliation_countries': 'Testland; Examplestan',
-        'url': 'http://antestdb.com',
-        'online': False,
-        'url_status': "HTTPConnectionPool(host='147.8.74.24', port=80): Max retries exceeded with url: /16SpathDB (Caused by ConnectTimeoutError(<urllib3.connection.HTTPConnection object at 0x7f6f246776d0>, 'Connection to 147.8.74.24 timed out. (connect timeout=5)'))",
-        'short_name': 'AnTestDB',
-        'common_name': 'AnTestDB Common',
-        'full_name': 'AnTest Database Full',
-        'resource_prediction_metadata': {
-            'short_name_prob': '0.95',
-            'common_name_prob': '0.90',
-            'full_name_prob': '0.85'
-        }
-    }
+@pytest.mark.parametrize('record,expected', [(record_A, expected_A), (record_B, expected_B)], ids=['online', 'timeout'])
+def test_split_record_data(record, expected):
+    assert split_record_data(dict(record)) == expected
+
+def test_iter_records(tmp_path):
+    csv_path = tmp_path / 'inventory.csv'
+    csv_path.write_text(
+        'ID,best_name,extracted_url,grant_ids\n'
+        '1234,TestDB,http://testdb.com,\n'
+        '"5678, 0123",AnTestDB,http://antestdb.com,G1\n'
+    )
+
+    result = list(iter_records(str(csv_path), {'version_name': 'v1'}))
+
+    assert result == [
+        {'pubmed_id': '1234', 'short_name': 'TestDB', 'url': 'http://testdb.com', 'ext_grant_ids': None, 'version_name': 'v1'},
+        {'pubmed_id': '5678, 0123', 'short_name': 'AnTestDB', 'url': 'http://antestdb.com', 'ext_grant_ids': 'G1', 'version_name': 'v1'},
+    ]
+
+def test_iter_pending_records(tmp_path):
+    # quoted multi-line cells are one record; resumed and already-loaded subrecords are skipped lazily
+    csv_path = tmp_path / 'inventory.csv'
+    csv_path.write_text(
+        'ID,best_name,best_name_prob,best_common_prob,best_full_prob,extracted_url_status,authors,affiliation_countries\n'
+        '1111,SkipDB,0.9,,,200,A,X\n'
+        '"1234,\n5678",TestDB,0.9,,,200,A,X\n'
+        '9012,AnTestDB,0.9,,,200,A,X\n'
+    )
+
+    pending = iter_pending_records(iter_records(str(csv_path)), {('TestDB', '5678')}, resume_from='TestDB')
+
+    assert next(pending)['pubmed_id'] == '1234'
+    assert [(r['short_name'], r['pubmed_id']) for r in pending] == [('AnTestDB', '9012')]
+
+def test_fetch_loaded_records(db_conn):
+    assert fetch_loaded_records(db_conn, 'v1.1.1') == {('test_resource', '321123')}
+    assert fetch_loaded_records(db_conn, 'no_such_version') == set()
+
+class FakeEngine:
+    # engine.begin() without a database, counting the batch transactions
+    def __init__(self):
+        self.batches = 0
+    def begin(self):
+        self.batches += 1
+        return nullcontext('conn')
+
+class FakeResource:
+    # fails the batch write while `deadlocks` remain, recording the successful writes
+    def __init__(self, name, deadlocks, written):
+        self.name, self.deadlocks, self.written = name, deadlocks, written
+    def __deepcopy__(self, memo): # copies share the counters
+        return FakeResource(self.name, self.deadlocks, self.written)
+    def write(self, conn=None, engine=None, debug=False):
+        if conn is not None and self.deadlocks[0] > 0:
+            self.deadlocks[0] -= 1
+            raise OperationalError('INSERT ...', {}, Exception(1213, 'Deadlock found'))
+        self.written.append((self.name, conn))
+
+@pytest.mark.parametrize('deadlocks,expected_batches,expected_written', [
+    (1, 2, [('a', 'conn'), ('b', 'conn')]), # retried as a batch
+    (9, 3, [('a', None), ('b', None)]), # still deadlocking: written one record at a time
+], ids=['batch_retry', 'per_record_fallback'])
+def test_write_resources_retries_deadlocks(deadlocks, expected_batches, expected_written):
+    engine, written, remaining = FakeEngine(), [], [deadlocks]
+    resources = [FakeResource(n, remaining, written) for n in ('a', 'b')]
 
-    result_B = split_record_data(record_B)
+    with mock.patch.object(load_inventory.time, 'sleep'):
+        write_resources(resources, engine)
 
-    assert result_B == expected_B
\ No newline at end of file
+    assert engine.batches == expected_batches
+    assert written == expected_written